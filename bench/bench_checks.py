@@ -0,0 +1,207 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Micro-benchmark of the evaluation of the checks by the runtime.
+
+Measures the cost per check and per cycle of the checks of each kind,
+with the generic comparison, with the comparators chosen at registration,
+and with the functions generated per set of checks. Then measures the cost
+of the checks with a finite sustain, with a scan of the checks to remove and
+with the expiry scheduling. Last, measures the cost of the checks evaluated
+at each cycle, evaluated at once by the deferred runtime, and evaluated when
+the outputs change, the outputs being constant:
+
+.. code:: text
+
+   python bench/bench_checks.py [<cycles>]
+"""
+
+import contextlib
+import io
+import math
+import sys
+import time
+from typing import Callable
+
+from ansys.scade.pyhg.lib.thgrt import (
+    ChangeDrivenThgrt,
+    Check,
+    DeferredThgrt,
+    Thgrt,
+    compare,
+    get_accessor,
+)
+
+CHECKS = 1000
+# number of runs of each measure, the best one is kept
+REPEAT = 5
+
+# kind -> expected value, tolerance
+KINDS = {
+    'boolean': (True, 0),
+    'integer': (3, 0),
+    'absolute': (2.5, 0.1),
+    'relative': (2.5, -0.1),
+    'nan': (math.nan, 0),
+}
+
+
+class Root:
+    """Operator under test, with constant outputs matching the checks."""
+
+    def call_cycle(self):
+        """Run a cycle."""
+        pass
+
+
+class GenericThgrt(Thgrt):
+    """Runtime evaluating the checks with the generic comparison."""
+
+    def check_values(self):
+        """Check the values."""
+        for name, check in self.checks.items():
+            value = getattr(self.root, name)
+            passed = compare(value, check.expected, check.tolerance)
+            if not passed:
+                self.log_failure(self.step, name, value, check.expected)
+            self.test_result = self.test_result and passed
+
+
+class InterpretedThgrt(Thgrt):
+    """Runtime evaluating the checks one after the other."""
+
+    evaluator_threshold = None
+
+
+class ScanThgrt(Thgrt):
+    """Runtime scanning the checks to remove at each cycle."""
+
+    def check(self, name, expected, sustain=1, tolerance=0, filter_=''):
+        """Register a check, as ``Thgrt.check`` without scheduling its removal."""
+        if isinstance(expected, (tuple, list)):
+            raise NotImplementedError
+        check = Check(expected, sustain, tolerance, filter_)
+        check.read = get_accessor(name)
+        self.checks[name] = check
+        self.evaluator = None
+        self.unchanged = 0
+
+    def check_values(self):
+        """Check the values."""
+        root = self.root
+        to_remove = []
+        for name, check in self.checks.items():
+            value = check.read(root)
+            passed = check.compare(value)  # type: ignore
+            if not passed:
+                self.log_failure(self.step, name, value, check.expected)
+            self.test_result = self.test_result and passed
+            if check.sustain == 1:
+                to_remove.append(name)
+            elif check.sustain != -1:
+                check.sustain -= 1
+        for name in to_remove:
+            self.checks.pop(name)
+
+
+def measure_sustain(cls: type, cycles: int, one_shot: bool) -> float:
+    """
+    Return the time per check and per cycle of checks with a finite sustain, in nanoseconds.
+
+    The checks are either registered at each step, for one cycle, or once,
+    for all the cycles.
+    """
+    root = Root()
+    names = ['o%d' % i for i in range(CHECKS)]
+    for name in names:
+        setattr(root, name, 3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        rt = cls(root, 'Root', 'Bench')
+    start = time.perf_counter()
+    if one_shot:
+        for _ in range(cycles):
+            for name in names:
+                rt.check(name, 3)
+            rt.cycle(1)
+    else:
+        for name in names:
+            rt.check(name, 3, sustain=cycles)
+        rt.cycle(cycles)
+    return (time.perf_counter() - start) / cycles / CHECKS * 1e9
+
+
+def measure(cls: type, expected, tolerance: float, cycles: int) -> float:
+    """Return the time per check and per cycle, in nanoseconds."""
+    root = Root()
+    for i in range(CHECKS):
+        setattr(root, 'o%d' % i, expected)
+    with contextlib.redirect_stdout(io.StringIO()):
+        # banner of the runtime
+        rt = cls(root, 'Root', 'Bench')
+    for i in range(CHECKS):
+        rt.check('o%d' % i, expected, sustain=-1, tolerance=tolerance)
+    start = time.perf_counter()
+    rt.cycle(cycles)
+    with contextlib.redirect_stdout(io.StringIO()):
+        # result of the test, and the failures of the deferred runtime
+        rt.close()
+    return (time.perf_counter() - start) / cycles / CHECKS * 1e9
+
+
+def best(measure_: Callable[..., float], *args) -> float:
+    """Return the best time of several runs of a measure."""
+    return min(measure_(*args) for _ in range(REPEAT))
+
+
+def main():
+    """Run the benchmark."""
+    cycles = int(sys.argv[1]) if sys.argv[1:] else 1000
+    print('%d checks, %d cycles, ns per check and per cycle' % (CHECKS, cycles))
+    print('%-10s %10s %12s %10s %8s' % ('kind', 'generic', 'specialized', 'generated', 'speedup'))
+    for kind, (expected, tolerance) in KINDS.items():
+        before = best(measure, GenericThgrt, expected, tolerance, cycles)
+        specialized = best(measure, InterpretedThgrt, expected, tolerance, cycles)
+        after = best(measure, Thgrt, expected, tolerance, cycles)
+        print(
+            '%-10s %10.1f %12.1f %10.1f %7.1fx' % (kind, before, specialized, after, before / after)
+        )
+    print()
+    print('%d checks with a finite sustain, ns per check and per cycle' % CHECKS)
+    print('%-10s %10s %12s %8s' % ('sustain', 'scan', 'expiry', 'speedup'))
+    for kind, one_shot in [('one-shot', True), ('sustained', False)]:
+        before = best(measure_sustain, ScanThgrt, cycles, one_shot)
+        after = best(measure_sustain, InterpretedThgrt, cycles, one_shot)
+        print('%-10s %10.1f %12.1f %7.1fx' % (kind, before, after, before / after))
+    print()
+    print('%d checks, %d cycles, ns per check and per cycle' % (CHECKS, cycles))
+    print('%-10s %10s %10s %10s' % ('kind', 'immediate', 'deferred', 'changes'))
+    for kind, (expected, tolerance) in KINDS.items():
+        before = best(measure, Thgrt, expected, tolerance, cycles)
+        deferred = best(measure, DeferredThgrt, expected, tolerance, cycles)
+        changes = best(measure, ChangeDrivenThgrt, expected, tolerance, cycles)
+        print('%-10s %10.1f %10.1f %10.1f' % (kind, before, deferred, changes))
+
+
+if __name__ == '__main__':
+    main()
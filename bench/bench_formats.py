@@ -0,0 +1,118 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Benchmark of the formats of the generated scripts.
+
+Generates a synthetic scenario with each format, and measures the time to
+compile the script, to load its byte code, and to run it. The run time of
+the ``table`` format includes the parsing of its rows:
+
+.. code:: text
+
+   python bench/bench_formats.py [<steps>]
+"""
+
+import contextlib
+import io
+import marshal
+import sys
+import time
+import types
+
+from ansys.scade.pyhg.backends import create_backend
+from ansys.scade.pyhg.emitter import MemoryEmitter
+from ansys.scade.pyhg.pyhg import IoInfo, PyHG
+
+INPUTS = 10
+OUTPUTS = 5
+
+
+class Model:
+    """Operator under test: the outputs are copies of the first inputs."""
+
+    def __init__(self):
+        """Initialize the operator."""
+        for i in range(INPUTS):
+            setattr(self, 'i%d' % i, 0)
+        for i in range(OUTPUTS):
+            setattr(self, 'o%d' % i, 0)
+
+    def call_cycle(self):
+        """Run a cycle."""
+        for i in range(OUTPUTS):
+            setattr(self, 'o%d' % i, getattr(self, 'i%d' % i))
+
+
+def generate(format_: str, steps: int) -> str:
+    """Generate a scenario with a given format."""
+    gen = PyHG()
+    gen.module = 'bench_model'
+    gen.class_ = 'Model'
+    gen.operator_path = 'P::Model'
+    gen.procedure_name = 'Bench'
+    gen.ios = {'i%d' % i: IoInfo('I', 'root', 'i%d' % i) for i in range(INPUTS)}
+    gen.ios.update({'o%d' % i: IoInfo('O', 'root', 'o%d' % i) for i in range(OUTPUTS)})
+    gen.f = MemoryEmitter()
+    gen.backend = create_backend(format_, gen)
+    gen.start_scenario()
+    for step in range(steps):
+        gen.on_comment(0, 0, '# step %d' % step)
+        for i in range(INPUTS):
+            gen.on_set(0, 0, 'i%d' % i, str(step % 7 + i))
+        for i in range(OUTPUTS):
+            gen.on_check(0, 0, 'o%d' % i, str(step % 7 + i), '', '', '', '')
+        gen.on_cycle(0, 0, '')
+    gen.close_scenario()
+    gen.f.close()
+    return gen.f.text
+
+
+def main():
+    """Run the benchmark."""
+    steps = int(sys.argv[1]) if sys.argv[1:] else 20000
+    model = types.ModuleType('bench_model')
+    model.Model = Model  # type: ignore
+    sys.modules['bench_model'] = model
+
+    print('%d steps, %d statements per step' % (steps, INPUTS + OUTPUTS + 1))
+    print('%-10s %10s %10s %10s %14s' % ('format', 'compile', 'load', 'run', 'steps/s'))
+    for format_ in ['script', 'functions', 'table']:
+        text = generate(format_, steps)
+        start = time.perf_counter()
+        code = compile(text, format_, 'exec')
+        compiled = time.perf_counter()
+        # emulates the loading of the .pyc file
+        code = marshal.loads(marshal.dumps(code))
+        loaded = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            exec(code, {'__name__': format_})
+        run = time.perf_counter()
+        print(
+            '%-10s %9.3fs %9.3fs %9.3fs %14.0f'
+            % (format_, compiled - start, loaded - compiled, run - loaded, steps / (run - loaded))
+        )
+
+
+if __name__ == '__main__':
+    main()
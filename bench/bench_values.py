@@ -0,0 +1,61 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Benchmark of the parsers for the scenario values.
+
+Compares the hand-written parser with the pyparsing grammar:
+
+.. code:: text
+
+   python bench/bench_values.py
+"""
+
+import timeit
+
+from ansys.scade.pyhg.values import ValueParser, value_defn
+
+VALUES = {
+    'scalar': '3.14_f64',
+    'boolean': 'true',
+    'array': '(' + ', '.join('%d_i32' % i for i in range(16)) + ')',
+    'matrix': '(' + ', '.join('(1.0, 2.0, 3.0, 4.0)' for _ in range(8)) + ')',
+    'nested': "(7_ui8, 3.14, +5_f32, {r : (t, f, true), i : 'x', s : {a : (1, 2), b : -Inf}})",
+}
+
+
+def main():
+    """Run the benchmark."""
+    print('%-10s %12s %12s %8s' % ('value', 'pyparsing', 'hand-written', 'speedup'))
+    for name, text in VALUES.items():
+        number = 2000
+        grammar = timeit.timeit(lambda: value_defn.parse_string(text), number=number)
+        parser = timeit.timeit(lambda: ValueParser(text).parse(), number=number)
+        print(
+            '%-10s %10.1fus %10.1fus %7.1fx'
+            % (name, grammar / number * 1e6, parser / number * 1e6, grammar / parser)
+        )
+
+
+if __name__ == '__main__':
+    main()
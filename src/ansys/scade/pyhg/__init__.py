@@ -22,17 +22,29 @@
 
 """SCADE Test Harness Generator for Python."""
 
-import importlib.metadata as importlib_metadata
-from pathlib import Path
+TARGET = 'PYHG2'
 
-__version__ = importlib_metadata.version(__name__.replace('.', '-'))
-"""The version of the package."""
 
+def __getattr__(name: str) -> str:
+    """
+    Return the lazy attributes of the package.
 
-TARGET = 'PYHG2'
+    ``__version__``, the version of the package, is computed on demand:
+    ``importlib.metadata`` is expensive to import, and the generated scripts
+    do not need it.
+    """
+    if name == '__version__':
+        import importlib.metadata as importlib_metadata
+
+        version = importlib_metadata.version(__name__.replace('.', '-'))
+        globals()[name] = version
+        return version
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
 
 
 def srg() -> str:
     """Path of the SCADE Studio registry file."""
+    from pathlib import Path
+
     # the package's srg file is located in the same directory
     return str(Path(__file__).parent / 'pyhg.srg')
@@ -0,0 +1,277 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Intermediate representation of the actions of a scenario.
+
+The callbacks of the generator produce actions, pushed through a pipeline
+of optimization passes before being rendered by a backend. The passes are
+streamed: they keep only the state they need, so that the memory used does
+not depend on the length of the scenarios.
+"""
+
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from ansys.scade.pyhg.backends import Backend
+
+
+class SetAction(NamedTuple):
+    """Assignment of a literal to an input or a sensor."""
+
+    root: str
+    path: str
+    literal: str
+
+    def render(self, backend: 'Backend'):
+        """Render the action with a backend."""
+        backend.set(self.root, self.path, self.literal)
+
+
+class BulkSetAction(NamedTuple):
+    """Assignment of the whole value of an array, the literal being nested tuples."""
+
+    root: str
+    path: str
+    literal: str
+
+    def render(self, backend: 'Backend'):
+        """Render the action with a backend."""
+        backend.bulk_set(self.root, self.path, self.literal)
+
+
+class CheckAction(NamedTuple):
+    """Registration of a check."""
+
+    name: str
+    literal: str
+    sustain: int
+    tolerance: str
+    filter_: str
+
+    def render(self, backend: 'Backend'):
+        """Render the action with a backend."""
+        backend.check(self.name, self.literal, self.sustain, self.tolerance, self.filter_)
+
+
+class UncheckAction(NamedTuple):
+    """Removal of a check."""
+
+    name: str
+
+    def render(self, backend: 'Backend'):
+        """Render the action with a backend."""
+        backend.uncheck(self.name)
+
+
+class CycleAction(NamedTuple):
+    """Execution of a number of cycles."""
+
+    cycles: int
+
+    def render(self, backend: 'Backend'):
+        """Render the action with a backend."""
+        backend.cycle(self.cycles)
+
+
+class CommentAction(NamedTuple):
+    """Comment of the scenario."""
+
+    text: str
+
+    def render(self, backend: 'Backend'):
+        """Render the action with a backend."""
+        backend.comment(self.text)
+
+
+Action = Union[SetAction, BulkSetAction, CheckAction, UncheckAction, CycleAction, CommentAction]
+
+
+class Stage:
+    """Element of a pipeline of actions, forwarding the actions to the next one."""
+
+    def __init__(self, next_: Optional['Stage'] = None):
+        """Initialize the stage."""
+        self.next_ = next_
+
+    def push(self, action: Action):
+        """Process an action."""
+        assert self.next_  # nosec B101  # addresses linter
+        self.next_.push(action)
+
+    def flush(self):
+        """Forward the pending actions, if any."""
+        assert self.next_  # nosec B101  # addresses linter
+        self.next_.flush()
+
+
+class Renderer(Stage):
+    """Last stage of a pipeline, calling a function for each action."""
+
+    def __init__(self, render: Callable[[Action], None]):
+        """Initialize the stage."""
+        super().__init__()
+        self.render = render
+
+    def push(self, action: Action):
+        """Render an action."""
+        self.render(action)
+
+    def flush(self):
+        """Nothing to do: the actions are rendered as soon as they are pushed."""
+        pass
+
+
+class MergeCycles(Stage):
+    """Merge consecutive cycle actions, for example ``cycle(1)`` twice into ``cycle(2)``."""
+
+    def __init__(self, next_: Stage):
+        """Initialize the stage."""
+        super().__init__(next_)
+        # number of pending cycles
+        self.cycles = 0
+
+    def push(self, action: Action):
+        """Accumulate the cycles and forward the other actions."""
+        if isinstance(action, CycleAction):
+            self.cycles += action.cycles
+        else:
+            self.flush_cycles()
+            super().push(action)
+
+    def flush(self):
+        """Forward the pending cycles."""
+        self.flush_cycles()
+        super().flush()
+
+    def flush_cycles(self):
+        """Forward the pending cycles, if any."""
+        if self.cycles:
+            super().push(CycleAction(self.cycles))
+            self.cycles = 0
+
+
+def _prefixes(path: str) -> Iterator[str]:
+    """Return the paths of the structures or arrays containing the element of a path."""
+    for i, char in enumerate(path):
+        if i > 0 and char in '.[':
+            yield path[:i]
+
+
+class RemoveRedundantSets(Stage):
+    """
+    Remove the assignments of the value an input already has.
+
+    The inputs keep their values from one cycle to the next one. The paths
+    are compared as text: a set that overlaps previous ones, for example
+    ``a`` after ``a[0]``, invalidates their values.
+    """
+
+    def __init__(self, next_: Stage):
+        """Initialize the stage."""
+        super().__init__(next_)
+        # (root, path) -> literal
+        self.values: Dict[Tuple[str, str], str] = {}
+        # (root, path) of the structures or arrays containing an assigned path
+        self.containers: Set[Tuple[str, str]] = set()
+
+    def push(self, action: Action):
+        """Forward the actions except the redundant sets."""
+        if isinstance(action, (SetAction, BulkSetAction)):
+            key = (action.root, action.path)
+            if self.values.get(key) == action.literal:
+                return
+            for prefix in _prefixes(action.path):
+                container = (action.root, prefix)
+                self.values.pop(container, None)
+                self.containers.add(container)
+            if key in self.containers:
+                # the set overrides the values of the assigned elements
+                for root, path in list(self.values):
+                    if root == action.root and path[: len(action.path) + 1] in {
+                        action.path + '.',
+                        action.path + '[',
+                    }:
+                        del self.values[(root, path)]
+            self.values[key] = action.literal
+        super().push(action)
+
+
+class RemoveDuplicateChecks(Stage):
+    """Remove the checks registered again with the same expectation before the next cycle."""
+
+    def __init__(self, next_: Stage):
+        """Initialize the stage."""
+        super().__init__(next_)
+        # name -> check, for the checks registered since the last cycle
+        self.checks: Dict[str, CheckAction] = {}
+
+    def push(self, action: Action):
+        """Forward the actions except the duplicate checks."""
+        if isinstance(action, CheckAction):
+            if self.checks.get(action.name) == action:
+                return
+            self.checks[action.name] = action
+        elif isinstance(action, UncheckAction):
+            self.checks.pop(action.name, None)
+        elif isinstance(action, CycleAction) and action.cycles:
+            self.checks = {}
+        super().push(action)
+
+
+# optimization passes, in order
+PASSES: List[Callable[[Stage], Stage]] = [RemoveRedundantSets, RemoveDuplicateChecks, MergeCycles]
+
+
+def create_pipeline(render: Callable[[Action], None], optimize: bool = True) -> Stage:
+    """
+    Create a pipeline of actions.
+
+    Parameters
+    ----------
+    render : Callable[[Action], None]
+        Function called with the actions leaving the pipeline.
+    optimize : bool
+        Whether the actions go through the optimization passes.
+
+    Returns
+    -------
+    Stage
+        First stage of the pipeline.
+    """
+    stage: Stage = Renderer(render)
+    if optimize:
+        for pass_ in reversed(PASSES):
+            stage = pass_(stage)
+    return stage
@@ -0,0 +1,340 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Rendering of the scenario actions into Python scripts.
+
+A backend receives the actions of a record, already resolved by the
+generator, and writes them to the generator's output in a given format.
+"""
+
+import json
+import math
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    from ansys.scade.pyhg.pyhg import PyHG
+
+
+class Backend:
+    """
+    Base class for the backends.
+
+    The base class writes the header and the footer of the scripts, common to
+    all the formats. The actions are:
+
+    * set: Assignment of an input, either a root's input or a sensor.
+    * bulk_set: Assignment of the whole value of an array, as nested tuples.
+    * check: Registration of a check, with its sustain (``-1`` for ever),
+      its tolerance (empty when none, negative when relative) and its filter.
+    * uncheck: Removal of a check.
+    * cycle: Execution of a number of cycles.
+    * comment: A comment line.
+    """
+
+    def __init__(self, generator: 'PyHG'):
+        """Initialize the backend."""
+        self.generator = generator
+
+    def writeln(self, text: str):
+        """Write a line of text to the output file."""
+        self.generator.writeln(text)
+
+    def start(self):
+        """Write the header of the scenario."""
+        from ansys.scade.pyhg.emitter import Emitter
+        from ansys.scade.pyhg.pyhg import get_banner
+
+        gen = self.generator
+        # the imports, if any, are inserted after the header
+        assert isinstance(gen.f, Emitter)  # nosec B101  # addresses linter
+        gen.f.write_header('# generated by %s\n' % get_banner())
+        self.writeln('')
+        sensors = ', sensors' if gen.sensors else ''
+        self.writeln('from %s import %s%s' % (gen.module, gen.class_, sensors))
+        # runtime provided as module.class
+        path = gen.runtime.split('.')
+        self.writeln('from %s import %s as Thgrt' % ('.'.join(path[:-1]), path[-1]))
+        self.writeln('')
+        self.writeln('# instance of root operator')
+        self.writeln('root = %s()' % (gen.class_))
+        self.writeln('')
+        self.writeln('# instance of Thgrt')
+        self.writeln(
+            "thgrt = Thgrt(root, '{}', '{}')".format(gen.operator_path, gen.procedure_name)
+        )
+        self.writeln('')
+
+    def close(self):
+        """Write the footer of the scenario."""
+        self.writeln('thgrt.close()')
+        self.writeln('# end of file')
+
+    def set(self, root: str, path: str, literal: str):
+        """Render a set action."""
+        raise NotImplementedError
+
+    def bulk_set(self, root: str, path: str, literal: str):
+        """Render a bulk set action."""
+        raise NotImplementedError
+
+    def check(self, name: str, literal: str, sustain: int, tolerance: str, filter_: str):
+        """Render a check action."""
+        raise NotImplementedError
+
+    def uncheck(self, name: str):
+        """Render an uncheck action."""
+        raise NotImplementedError
+
+    def cycle(self, cycles: int):
+        """Render a cycle action."""
+        raise NotImplementedError
+
+    def comment(self, text: str):
+        """Render a comment."""
+        raise NotImplementedError
+
+
+class ScriptBackend(Backend):
+    """Backend producing one Python statement per action."""
+
+    # prefix of the runtime's methods
+    runtime = 'thgrt.'
+
+    def emit(self, text: str):
+        """Write a statement."""
+        self.writeln(text)
+
+    def set(self, root: str, path: str, literal: str):
+        """Render a set action."""
+        self.emit('%s.%s = %s' % (root, path, literal))
+
+    def bulk_set(self, root: str, path: str, literal: str):
+        """Render a bulk set action."""
+        self.emit('%sset_value(%s, %r, %s)' % (self.runtime, root, path, literal))
+
+    def check(self, name: str, literal: str, sustain: int, tolerance: str, filter_: str):
+        """Render a check action."""
+        args = ''
+        if sustain != 1:
+            args += f', sustain={sustain}'
+        if filter_:
+            args += f', filter_={filter_}'
+        if tolerance:
+            args += f', tolerance={tolerance}'
+        self.emit(f'{self.runtime}check("{name}", {literal}{args})')
+
+    def uncheck(self, name: str):
+        """Render an uncheck action."""
+        self.emit(f'{self.runtime}uncheck("{name}")')
+
+    def cycle(self, cycles: int):
+        """Render a cycle action."""
+        self.emit('{}cycle({})'.format(self.runtime, cycles))
+
+    def comment(self, text: str):
+        """Render a comment."""
+        self.emit(text)
+
+
+class FunctionsBackend(ScriptBackend):
+    """
+    Backend producing the statements in a sequence of functions.
+
+    Each function contains at least ``chunk_size`` statements, up to the
+    end of a step, and binds ``root``, ``sensors`` and the methods of the
+    runtime to local variables. This avoids the lookups of the global names
+    and the compilation of huge code objects for long scenarios.
+    """
+
+    runtime = ''
+
+    def __init__(self, generator: 'PyHG', chunk_size: int = 1000):
+        """Initialize the backend."""
+        super().__init__(generator)
+        self.chunk_size = chunk_size
+        # names of the functions
+        self.parts: List[str] = []
+        # number of statements of the current function, -1 when none is open
+        self.statements = -1
+
+    def start(self):
+        """Write the header of the scenario."""
+        super().start()
+        self.writeln('# the scenario is split into functions, called in sequence')
+
+    def close(self):
+        """Write the calls to the functions and the footer of the scenario."""
+        self.close_part()
+        self.writeln('')
+        self.writeln('')
+        self.writeln('for _part in %s:' % _tuple(self.parts))
+        self.writeln('    _part()')
+        super().close()
+
+    def open_part(self):
+        """Start a new function."""
+        name = '_part_%d' % (len(self.parts) + 1)
+        self.parts.append(name)
+        sensors = ', sensors=sensors' if self.generator.sensors else ''
+        self.writeln('')
+        self.writeln('')
+        self.writeln(
+            'def %s(\n    root=root%s, set_value=thgrt.set_value,\n'
+            '    check=thgrt.check, uncheck=thgrt.uncheck, cycle=thgrt.cycle,\n):' % (name, sensors)
+        )
+        self.statements = 0
+
+    def close_part(self):
+        """Close the current function, if any."""
+        if self.statements == 0:
+            # the function contains only comments
+            self.writeln('    pass')
+        self.statements = -1
+
+    def emit(self, text: str):
+        """Write a statement to the current function."""
+        if self.statements == -1:
+            self.open_part()
+        self.writeln('    ' + text)
+        if text[0] != '#':
+            self.statements += 1
+
+    def cycle(self, cycles: int):
+        """Render a cycle action and close the function when it is large enough."""
+        super().cycle(cycles)
+        if self.statements >= self.chunk_size:
+            self.close_part()
+
+
+def _tuple(items: List[str]) -> str:
+    """Return the Python syntax of a tuple."""
+    return '(%s,)' % items[0] if len(items) == 1 else '(%s)' % ', '.join(items)
+
+
+def _value(literal: str) -> object:
+    """Return the value of a literal, possibly referring to ``math.nan`` or ``math.inf``."""
+    # the literals are the constants the other formats write verbatim in the scripts
+    return eval(literal, {'__builtins__': {}, 'math': math})  # nosec B307
+
+
+class TableBackend(Backend):
+    """
+    Backend producing a table of steps, run by a fixed driver loop.
+
+    Each row of the table contains the sets, the checks and the unchecks to
+    perform before running a number of cycles. The rows are written as JSON
+    lines in a single string constant, parsed by ``Thgrt.load_steps``: unlike
+    the equivalent tuple literals or statements, the string costs nothing to
+    compile, whatever the length of the scenario.
+    """
+
+    def __init__(self, generator: 'PyHG'):
+        """Initialize the backend."""
+        super().__init__(generator)
+        # current row
+        self.sets: List[list] = []
+        self.checks: List[list] = []
+        self.unchecks: List[str] = []
+        # comments before the current row
+        self.comments: List[str] = []
+        # number of rows written
+        self.rows = 0
+        # index of the objects for the set actions
+        self.targets = {'root': 0, 'sensors': 1}
+
+    def start(self):
+        """Write the header of the scenario and open the table."""
+        super().start()
+        self.writeln('# steps: [sets, checks, unchecks, cycles], one JSON line per row')
+        self.writeln('# set: [target, path, value], target 0 for root and 1 for sensors')
+        self.writeln('# check: [name, expected, sustain, tolerance, filter]')
+        self.writeln('steps = thgrt.load_steps(')
+
+    def close(self):
+        """Close the table and write the driver."""
+        if self.sets or self.checks or self.unchecks:
+            self.flush(0)
+        for text in self.comments:
+            self.writeln('    ' + text)
+        if not self.rows:
+            self.writeln("    ''")
+        self.writeln(')')
+        self.writeln('')
+        targets = '(root, sensors)' if self.generator.sensors else '(root,)'
+        self.writeln('thgrt.run_steps(%s, steps)' % targets)
+        super().close()
+
+    def flush(self, cycles: int):
+        """Write the current row."""
+        for text in self.comments:
+            self.writeln('    ' + text)
+        row = json.dumps([self.sets, self.checks, self.unchecks, cycles])
+        self.writeln('    %r' % (row + '\n'))
+        self.rows += 1
+        self.sets, self.checks, self.unchecks, self.comments = [], [], [], []
+
+    def set(self, root: str, path: str, literal: str):
+        """Add a set action to the current row."""
+        self.sets.append([self.targets[root], path, _value(literal)])
+
+    def bulk_set(self, root: str, path: str, literal: str):
+        """Add a bulk set action to the current row, run by ``Thgrt.set_value``."""
+        self.set(root, path, literal)
+
+    def check(self, name: str, literal: str, sustain: int, tolerance: str, filter_: str):
+        """Add a check action to the current row."""
+        if self.unchecks:
+            # the checks of a row are registered before the unchecks:
+            # start a new row to preserve the order of the actions
+            self.flush(0)
+        self.checks.append(
+            [name, _value(literal), sustain, _value(tolerance) if tolerance else 0, filter_]
+        )
+
+    def uncheck(self, name: str):
+        """Add an uncheck action to the current row."""
+        self.unchecks.append(name)
+
+    def cycle(self, cycles: int):
+        """Close the current row."""
+        self.flush(cycles)
+
+    def comment(self, text: str):
+        """Add a comment before the current row."""
+        self.comments.append(text)
+
+
+# backends per format
+BACKENDS = {'script': ScriptBackend, 'table': TableBackend, 'functions': FunctionsBackend}
+
+
+def create_backend(format_: str, generator: 'PyHG') -> Backend:
+    """Return a backend for a given format."""
+    try:
+        backend = BACKENDS[format_](generator)
+    except KeyError:
+        raise ValueError('%s: unknown format' % format_) from None
+    if isinstance(backend, FunctionsBackend) and generator.chunk_size:
+        backend.chunk_size = generator.chunk_size
+    return backend
@@ -0,0 +1,200 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Output of the generated scripts.
+
+The emitters buffer the body of a script so that the header, in particular
+the imports, can be completed once the body is known. They write the target
+file only when its content changes, to preserve the timestamps of the
+unchanged files and the caches depending on them.
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator, List, TextIO, Union
+
+# size of the chunks when copying or comparing streams
+CHUNK_SIZE = 1 << 16
+
+
+class Emitter(ABC):
+    """Abstraction for the output of a generated script."""
+
+    def __init__(self):
+        """Initialize the emitter."""
+        # lines before the imports
+        self.header: List[str] = []
+        # modules imported by the script
+        self.imports = set()
+
+    def write_header(self, text: str):
+        """Write some text before the imports."""
+        self.header.append(text)
+
+    def add_import(self, module: str):
+        """Add an import statement to the header."""
+        self.imports.add(module)
+
+    def get_prologue(self) -> str:
+        """Return the header and the imports."""
+        prologue = ''.join(self.header)
+        if self.imports:
+            prologue += '\n' + ''.join('import %s\n' % _ for _ in sorted(self.imports))
+        return prologue
+
+    @abstractmethod
+    def write(self, text: str):
+        """Write some text to the body."""
+        raise NotImplementedError
+
+    def writeln(self, text: str):
+        """Write a line of text to the body."""
+        self.write(text + '\n')
+
+    @abstractmethod
+    def close(self) -> bool:
+        """
+        Complete the script.
+
+        Returns
+        -------
+        bool
+            Whether the output has been modified.
+        """
+        raise NotImplementedError
+
+
+class MemoryEmitter(Emitter):
+    """Emitter storing the script in memory."""
+
+    def __init__(self):
+        """Initialize the emitter."""
+        super().__init__()
+        self.body: List[str] = []
+        # content of the script, once closed
+        self.text = ''
+
+    def write(self, text: str):
+        """Write some text to the body."""
+        self.body.append(text)
+
+    def getvalue(self) -> str:
+        """Return the content of the script."""
+        return self.get_prologue() + ''.join(self.body)
+
+    def close(self) -> bool:
+        """Complete the script."""
+        self.text = self.getvalue()
+        self.body = []
+        return True
+
+
+class FileEmitter(MemoryEmitter):
+    """Emitter writing the script to a file, when closed."""
+
+    def __init__(self, path: Path):
+        """Initialize the emitter."""
+        super().__init__()
+        self.path = path
+
+    def close(self) -> bool:
+        """Write the file if its content changed."""
+        super().close()
+        try:
+            if self.path.read_text() == self.text:
+                return False
+        except OSError:
+            pass
+        self.path.write_text(self.text)
+        return True
+
+
+class StreamEmitter(Emitter):
+    """
+    Emitter spooling the body to a temporary file.
+
+    The memory used for the body is bounded: this emitter is suited to very
+    large scripts. The target is either a file or a stream.
+    """
+
+    def __init__(self, target: Union[Path, TextIO], max_size: int = 1 << 20):
+        """Initialize the emitter."""
+        import tempfile
+
+        super().__init__()
+        self.target = target
+        self.body = tempfile.SpooledTemporaryFile(max_size=max_size, mode='w+')
+
+    def write(self, text: str):
+        """Write some text to the body."""
+        self.body.write(text)
+
+    def chunks(self) -> Iterator[str]:
+        """Return the content of the script, in chunks."""
+        yield self.get_prologue()
+        self.body.seek(0)
+        yield from iter(lambda: self.body.read(CHUNK_SIZE), '')
+
+    def is_unchanged(self, path: Path) -> bool:
+        """Return whether the existing file has the same content as the script."""
+        try:
+            with path.open() as f:
+                for chunk in self.chunks():
+                    if f.read(len(chunk)) != chunk:
+                        return False
+                return f.read(1) == ''
+        except OSError:
+            return False
+
+    def close(self) -> bool:
+        """Write the script to the target, if its content changed."""
+        modified = True
+        if isinstance(self.target, Path):
+            if self.is_unchanged(self.target):
+                modified = False
+            else:
+                with self.target.open('w') as f:
+                    f.writelines(self.chunks())
+        else:
+            self.target.writelines(self.chunks())
+        self.body.close()
+        return modified
+
+
+def create_emitter(kind: str, path: Path) -> Emitter:
+    """
+    Return an emitter for a generated file.
+
+    Parameters
+    ----------
+    kind : str
+        Kind of emitter, either ``file`` or ``stream``.
+    path : Path
+        Path of the generated file.
+    """
+    if kind == 'file':
+        return FileEmitter(path)
+    elif kind == 'stream':
+        return StreamEmitter(path)
+    raise ValueError('%s: unknown emitter' % kind)
@@ -20,14 +20,38 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-"""Template for running all the tests from a directory hierarchy."""
+"""
+Template for running all the tests from a directory hierarchy.
 
+The results of the scenarios can be written in JUnit XML and JSON formats,
+with the number of steps, the number of evaluations of the checks, the number
+of failures, the wall time and the time per cycle of each scenario:
+
+.. code:: text
+
+   python run.py [<path> ...] [--junit <file>] [--json <file>]
+"""
+
+import argparse
 import importlib
+import json
 from pathlib import Path
 import sys
+from typing import Dict, List, Optional
+import xml.etree.ElementTree as ET  # nosec B405  # writes only
 
 tests = {}
 tests_result = True
+# scenario -> result of the runtime, as a dictionary
+results: Dict[str, dict] = {}
+
+
+def get_result(thgrt) -> dict:
+    """Return the result of a runtime, reduced to its status when it does not provide it."""
+    result = getattr(thgrt, 'result', None)
+    if result is None:
+        return {'passed': thgrt.test_result}
+    return result._asdict()
 
 
 def run_all(dir: Path):
@@ -40,13 +64,62 @@ def run_all(dir: Path):
         scenario_module = importlib.import_module(scenario_module_name)
         tests[scenario.name] = scenario_module.thgrt.test_result
         tests_result = tests_result and scenario_module.thgrt.test_result
+        results[scenario.name] = get_result(scenario_module.thgrt)
 
 
-if __name__ == '__main__':
+def write_json(path: Path, results: Dict[str, dict]):
+    """Write the results in JSON format."""
+    scenarios = [dict(scenario=name, **result) for name, result in results.items()]
+    data = {'passed': all(_['passed'] for _ in scenarios), 'scenarios': scenarios}
+    Path(path).write_text(json.dumps(data, indent=2) + '\n')
+
+
+def write_junit(path: Path, name: str, results: Dict[str, dict]):
+    """Write the results in JUnit XML format, one test case per scenario."""
+    suites = ET.Element('testsuites')
+    failures = sum(not _['passed'] for _ in results.values())
+    duration = sum(_.get('time', 0.0) for _ in results.values())
+    suite = ET.SubElement(
+        suites,
+        'testsuite',
+        name=name,
+        tests=str(len(results)),
+        failures=str(failures),
+        time='%.6f' % duration,
+    )
+    for scenario, result in results.items():
+        case = ET.SubElement(
+            suite,
+            'testcase',
+            name=scenario,
+            classname=result.get('procedure', name),
+            time='%.6f' % result.get('time', 0.0),
+        )
+        properties = ET.SubElement(case, 'properties')
+        for key in ['steps', 'checks', 'failures', 'time_per_cycle']:
+            if key in result:
+                ET.SubElement(properties, 'property', name=key, value=str(result[key]))
+        if not result['passed']:
+            ET.SubElement(
+                case, 'failure', message='%s failures' % result.get('failures', 'unknown')
+            )
+    ET.ElementTree(suites).write(str(path), encoding='utf-8', xml_declaration=True)
+
+
+def main(args: Optional[List[str]] = None):
+    """Run all the scenarios and report the results."""
+    parser = argparse.ArgumentParser(description='Run all the scenarios of a directory.')
+    parser.add_argument(
+        'path', nargs='*', help="directory relative to this script, default 'scenarios'"
+    )
+    parser.add_argument('--junit', metavar='FILE', help='write the results in JUnit XML format')
+    parser.add_argument('--json', metavar='FILE', help='write the results in JSON format')
+    options = parser.parse_args(args)
+
     script_dir = Path(__file__).parent
 
-    if sys.argv[1:]:
-        scenario_dir = script_dir.joinpath(*sys.argv[1:])
+    if options.path:
+        scenario_dir = script_dir.joinpath(*options.path)
     else:
         scenario_dir = script_dir / 'scenarios'
 
@@ -74,3 +147,12 @@ if __name__ == '__main__':
             if not result:
                 print('    {}'.format(scenario))
     print('##################################')
+
+    if options.junit:
+        write_junit(Path(options.junit), scenario_dir.name, results)
+    if options.json:
+        write_json(Path(options.json), results)
+
+
+if __name__ == '__main__':
+    main()
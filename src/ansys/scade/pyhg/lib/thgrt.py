@@ -22,12 +22,246 @@
 
 """Runtime template for Python teste produced by Python Harness Generator."""
 
+from array import array
+from functools import lru_cache, partial
+import gc
+import json
+from keyword import iskeyword
 import math
+from operator import attrgetter, eq, itemgetter
+import re
+import sys
+import time
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+# elements of a path: .name, name or [index]
+_path_re = re.compile(r'\.?([A-Za-z_]\w*)|\[(\d+)\]')
+
+
+@lru_cache(maxsize=None)
+def parse_path(path: str) -> Tuple[Tuple[bool, object], ...]:
+    """
+    Split a path, for example ``v[1].x``, into its elements.
+
+    Returns
+    -------
+    Tuple[Tuple[bool, object], ...]
+        Elements of the path: ``(True, index)`` for an index,
+        ``(False, name)`` for an attribute.
+    """
+    elements = []
+    pos = 0
+    while pos < len(path):
+        match_ = _path_re.match(path, pos)
+        if not match_:
+            raise ValueError('%s: invalid path' % path)
+        name, index = match_.groups()
+        elements.append((True, int(index)) if index is not None else (False, name))
+        pos = match_.end()
+    if not elements:
+        raise ValueError('%s: invalid path' % path)
+    return tuple(elements)
+
+
+def assign(target: object, values: object):
+    """
+    Assign a sequence or a mapping, possibly nested, to an array or a structure.
+
+    A sequence of scalars is assigned in one call when the target supports
+    the slice assignment, for example a ctypes array, otherwise element by
+    element. The nested values are assigned in place.
+    """
+    if isinstance(values, dict):
+        for name, value in values.items():
+            if isinstance(value, (tuple, list, dict)):
+                assign(getattr(target, name), value)
+            else:
+                setattr(target, name, value)
+        return
+    if not any(isinstance(_, (tuple, list, dict)) for _ in values):  # type: ignore
+        try:
+            target[:] = values  # type: ignore
+            return
+        except (TypeError, ValueError):
+            pass
+    for index, value in enumerate(values):  # type: ignore
+        if isinstance(value, (tuple, list, dict)):
+            assign(target[index], value)  # type: ignore
+        else:
+            target[index] = value  # type: ignore
+
+
+def get_expression(path: str, target: str) -> Optional[str]:
+    """
+    Return the Python expression reading a path relative to a variable.
+
+    Returns
+    -------
+    Optional[str]
+        Expression, for example ``target.v[1].x``, or None when the path
+        is not valid or contains Python keywords.
+    """
+    try:
+        elements = parse_path(path)
+    except ValueError:
+        return None
+    if any(not is_index and iskeyword(key) for is_index, key in elements):  # type: ignore
+        return None
+    return target + ''.join('[%d]' % key if is_index else '.' + key for is_index, key in elements)
+
+
+@lru_cache(maxsize=None)
+def get_accessor(path: str) -> Callable[[object], object]:
+    """
+    Return a function reading the element designated by a path, for example ``v[1].x``.
+
+    The function is compiled from the expression of the path, so that reading
+    a nested element costs about the same as reading an attribute. Otherwise,
+    the attributes are read with ``attrgetter`` and the indexes with ``itemgetter``.
+    A name which is not a path is read with ``getattr``.
+    """
+    expression = get_expression(path, 'target')
+    if expression:
+        # the expression contains only identifiers, dots and indexes
+        return eval('lambda target: ' + expression)  # nosec B307  # validated path
+
+    try:
+        elements = parse_path(path)
+    except ValueError:
+        return lambda target: getattr(target, path)
+
+    getters = []
+    names = []
+    for is_index, key in elements:
+        if is_index:
+            if names:
+                getters.append(attrgetter('.'.join(names)))
+                names = []
+            getters.append(itemgetter(key))
+        else:
+            names.append(key)
+    if names:
+        getters.append(attrgetter('.'.join(names)))
+    if len(getters) == 1:
+        return getters[0]
+
+    def access(target):
+        for getter in getters:
+            target = getter(target)
+        return target
+
+    return access
+
+
+@lru_cache(maxsize=None)
+def get_numpy():
+    """Return the module ``numpy``, or None when it is not installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def compare(value, expected, tolerance: float) -> bool:
+    """
+    Compare a value to an expected value.
+
+    A negative value for tolerance means relative tolerance, otherwise the
+    tolerance is considered as absolute.
+    """
+    if math.isnan(expected):
+        return math.isnan(value)
+    elif tolerance < 0:
+        return math.isclose(value, expected, rel_tol=-tolerance, abs_tol=0)
+    else:
+        return math.isclose(value, expected, rel_tol=0, abs_tol=tolerance)
+
+
+@lru_cache(maxsize=4096, typed=True)
+def get_comparator(expected, tolerance: float) -> Callable[[object], bool]:
+    """
+    Return a function comparing a value to an expected value.
+
+    The function is specialized for the expected value and the tolerance,
+    with the same semantics as ``compare``: an equality for the booleans and
+    the checks without tolerance, for example the integers.
+
+    The functions are cached: the expected values of a scenario are often the same.
+    """
+    if isinstance(expected, float) and math.isnan(expected):
+        return math.isnan
+    if isinstance(expected, bool) or tolerance == 0:
+        return partial(eq, expected)
+    if tolerance > 0:
+
+        def absolute(value) -> bool:
+            # same as math.isclose with abs_tol, which holds for infinite values
+            return value == expected or abs(value - expected) <= tolerance  # type: ignore
+
+        return absolute
+
+    def relative(value) -> bool:
+        return math.isclose(value, expected, rel_tol=-tolerance, abs_tol=0)  # type: ignore
+
+    return relative
+
+
+def _items(values, suffix: str = '') -> Iterator[Tuple[str, object]]:
+    """Return the suffixes and the scalars of a possibly nested sequence."""
+    for index, value in enumerate(values):
+        if hasattr(value, '__len__') and not isinstance(value, str):
+            yield from _items(value, '%s[%d]' % (suffix, index))
+        else:
+            yield '%s[%d]' % (suffix, index), value
+
+
+def _isclose(np, actual, expected, tolerance):
+    """
+    Compare arrays of values to arrays of expected values, with the semantics of ``compare``.
+
+    The tolerance is either a scalar or an array of the same shape.
+    """
+    with np.errstate(invalid='ignore', over='ignore'):
+        difference = np.abs(actual - expected)
+        relative = tolerance < 0
+        if np.any(relative):
+            maximum = np.maximum(np.abs(actual), np.abs(expected))
+            bound = np.where(relative, -tolerance * maximum, tolerance)
+        else:
+            bound = tolerance
+        # same formula as math.isclose: the difference is infinite or NaN when
+        # a value is infinite, and the infinite values are close only to themselves
+        passed = (difference <= bound) & (difference < np.inf)
+    passed |= actual == expected
+    # the NaN values are close to each other as in compare
+    nan = np.isnan(expected)
+    if nan.any():
+        passed |= nan & np.isnan(actual)
+    return passed
+
+
+def _undefined(target: object) -> object:
+    """Accessor of the checks which are not registered."""
+    raise NotImplementedError
 
 
 class Check:
     """Check object for THG."""
 
+    __slots__ = ('expected', 'sustain', 'tolerance', 'filter', 'compare', 'expiry', 'read')
+
     def __init__(self, expected: object, sustain: int, tolerance: float, filter_: str):
         """Initialize the check."""
         self.expected = expected
@@ -35,11 +269,250 @@ class Check:
         self.tolerance = tolerance
         # not implemented
         self.filter = filter_
+        # comparator chosen once for all, None for the arrays
+        self.compare: Optional[Callable[[object], bool]] = get_comparator(expected, tolerance)
+        # step of the last evaluation of a check sustained for several cycles, else 0
+        self.expiry = 0
+        # accessor of the checked output, set when the check is registered
+        self.read: Callable[[object], object] = _undefined
+
+
+class ArrayCheck(Check):
+    """
+    Check object for a whole array, possibly multidimensional.
+
+    The elements are compared at once with NumPy when it is installed,
+    with the same semantics as ``compare``, otherwise one by one.
+    """
+
+    __slots__ = ('array',)
+
+    def __init__(self, expected: object, sustain: int, tolerance: float, filter_: str):
+        """Initialize the check."""
+        self.expected = expected
+        self.sustain = sustain
+        self.tolerance = tolerance
+        self.filter = filter_
+        self.compare = None
+        self.expiry = 0
+        self.read = _undefined
+        np = get_numpy()
+        self.array = np.asarray(expected, dtype=float) if np else None
+
+    def get_failures(self, value) -> List[Tuple[str, object, object]]:
+        """Return the suffix, the value and the expected value of the failing elements."""
+        if self.array is None:
+            actuals = list(_items(value))
+            expecteds = list(_items(self.expected))  # type: ignore
+            if [_[0] for _ in actuals] != [_[0] for _ in expecteds]:
+                # the shapes differ
+                return [('', value, self.expected)]
+            return [
+                (suffix, actual, expected)
+                for (suffix, actual), (_, expected) in zip(actuals, expecteds)
+                if not compare(actual, expected, self.tolerance)
+            ]
+
+        np = get_numpy()
+        actual = np.asarray(value, dtype=float)
+        if actual.shape != self.array.shape:
+            return [('', value, self.expected)]
+        passed = _isclose(np, actual, self.array, self.tolerance)
+        if passed.all():
+            return []
+        failures = []
+        for indexes in np.argwhere(~passed):
+            indexes = tuple(int(_) for _ in indexes)
+            actual_item, expected_item = value, self.expected
+            for index in indexes:
+                actual_item = actual_item[index]
+                expected_item = expected_item[index]  # type: ignore
+            failures.append((''.join('[%d]' % _ for _ in indexes), actual_item, expected_item))
+        return failures
+
+
+@lru_cache(maxsize=256)
+def compile_evaluator(signature: Tuple[Tuple[str, bool], ...]) -> Callable[..., bool]:
+    """
+    Return a function evaluating a set of checks.
+
+    The function is a straight-line code reading each output, comparing it
+    and logging the failures, in the order of the checks. It is cached per
+    signature of the set of checks.
+
+    Parameters
+    ----------
+    signature : Tuple[Tuple[str, bool], ...]
+        Names of the checks, and whether they are array checks.
+
+    Returns
+    -------
+    Callable[..., bool]
+        Function ``evaluate(root, checks, log_failure, step)``, returning
+        whether all the checks passed.
+    """
+    lines = ['def evaluate(root, checks, log_failure, step):']
+    if signature:
+        lines.append('    %s, = checks' % ', '.join('c%d' % i for i in range(len(signature))))
+    lines.append('    passed = True')
+    for i, (name, is_array) in enumerate(signature):
+        lines.append('    value = %s' % (get_expression(name, 'root') or 'c%d.read(root)' % i))
+        if is_array:
+            lines.append('    failures = c%d.get_failures(value)' % i)
+            lines.append('    if failures:')
+            lines.append('        passed = False')
+            lines.append('        for suffix, actual, expected in failures:')
+            lines.append('            log_failure(step, %r + suffix, actual, expected)' % name)
+        else:
+            lines.append('    if not c%d.compare(value):' % i)
+            lines.append('        passed = False')
+            lines.append('        log_failure(step, %r, value, c%d.expected)' % (name, i))
+    lines.append('    return passed')
+    namespace = {}
+    code = compile('\n'.join(lines), '<evaluator>', 'exec')
+    exec(code, namespace)  # nosec B102  # generated from validated paths
+    return namespace['evaluate']
+
+
+def _deviation(value, expected) -> float:
+    """Return the absolute difference between a value and its expected value, infinite if none."""
+    try:
+        deviation = abs(value - expected)
+    except TypeError:
+        return math.inf
+    return math.inf if math.isnan(deviation) else deviation
+
+
+class FailureSink:
+    """
+    Destination of the failures reported by the runtime, the standard output.
+
+    By default, the failures are written as soon as they are reported. When
+    ``cap`` is set, only the first ``cap`` failures of a check are written:
+    the next ones are aggregated into the first and last steps, the number of
+    failures and the worst deviation, written by ``close``. When
+    ``buffer_size`` is set, the lines are written by blocks.
+
+    The derived classes override ``write``, or ``emit`` to receive the lines
+    one by one.
+    """
+
+    def __init__(self, cap: Optional[int] = None, buffer_size: int = 0):
+        """Initialize the sink."""
+        self.cap = cap
+        self.buffer_size = buffer_size
+        self.lines: List[str] = []
+        # name -> count, first step, last step, worst deviation, and the
+        # step, value and expected value of the worst failure
+        self.failures: Dict[str, list] = {}
+
+    def report(self, step: int, name: str, value, expected):
+        """Report a failure."""
+        if self.cap is not None:
+            deviation = _deviation(value, expected)
+            failures = self.failures.get(name)
+            if failures is None:
+                failures = [0, step, step, -1.0, step, value, expected]
+                self.failures[name] = failures
+            failures[0] += 1
+            failures[2] = step
+            if deviation > failures[3]:
+                failures[3:] = [deviation, step, value, expected]
+            if failures[0] > self.cap:
+                return
+        self.emit('test failed at step {}: {}={} (expected {})'.format(step, name, value, expected))
+
+    def emit(self, line: str):
+        """Write a line, or add it to the buffer."""
+        if not self.buffer_size:
+            self.write(line + '\n')
+        else:
+            self.lines.append(line)
+            if len(self.lines) >= self.buffer_size:
+                self.flush()
+
+    def flush(self):
+        """Write the buffered lines."""
+        if self.lines:
+            self.write('\n'.join(self.lines) + '\n')
+            self.lines = []
+
+    def write(self, text: str):
+        """Write text to the standard output."""
+        sys.stdout.write(text)
+
+    def close(self):
+        """Write the failures which were not reported and the buffered lines."""
+        for name, failures in self.failures.items():
+            count, first, last, _, step, value, expected = failures
+            if count > self.cap:  # type: ignore
+                self.emit(
+                    'test failed at steps {} to {}: {} failed {} times, {} not reported, '
+                    'worst at step {}: {}={} (expected {})'.format(
+                        first, last, name, count, count - self.cap, step, name, value, expected
+                    )
+                )
+        self.failures = {}
+        self.flush()
+
+
+class FileSink(FailureSink):
+    """Failure sink writing to a file, given by its path or as a text stream."""
+
+    def __init__(self, file: Union[str, TextIO], cap: Optional[int] = None, buffer_size: int = 0):
+        """Initialize the sink."""
+        super().__init__(cap, buffer_size)
+        self.opened = isinstance(file, str)
+        self.file = open(file, 'w') if isinstance(file, str) else file
+
+    def write(self, text: str):
+        """Write text to the file."""
+        self.file.write(text)
+
+    def close(self):
+        """Write the remaining lines and close the file if the sink opened it."""
+        super().close()
+        if self.opened:
+            self.file.close()
+
+
+class QueueSink(FailureSink):
+    """Failure sink putting the lines into a queue, for example a ``queue.Queue``."""
+
+    def __init__(self, queue, cap: Optional[int] = None):
+        """Initialize the sink."""
+        super().__init__(cap)
+        self.queue = queue
+
+    def emit(self, line: str):
+        """Put a line into the queue."""
+        self.queue.put(line)
+
+
+class Result(NamedTuple):
+    """Result of a scenario, returned by ``Thgrt.close``."""
+
+    operator: str
+    procedure: str
+    passed: bool
+    # number of cycles run
+    steps: int
+    # number of evaluations of the checks, one per check and per cycle
+    checks: int
+    # number of failures reported
+    failures: int
+    # wall time from the creation of the runtime to its closure, in seconds
+    time: float
+    time_per_cycle: float
 
 
 class Thgrt:
     """THG runtime."""
 
+    # number of cycles a set of checks must remain unchanged before it is
+    # evaluated with a generated function, None to always interpret the checks
+    evaluator_threshold: Optional[int] = 1
+
     def __init__(self, root: object, operator: str, procedure_name: str):
         """Initialize the runtime."""
         self.step = 1
@@ -47,27 +520,151 @@ class Thgrt:
         self.root = root
         self.operator = operator
         self.procedure_name = procedure_name
-        # checks
+        # checks, in the order of their registration
         self.checks = {}
+        # step -> names of the checks with a finite sustain, evaluated for the
+        # last time at this step
+        self.expiries: Dict[int, List[str]] = {}
+        # checks registered for one cycle at the current step, removed after
+        # the evaluation without any expiry scheduling
+        self.one_shots: Dict[str, Check] = {}
+        # generated function evaluating the current checks, and its arguments
+        self.evaluator: Optional[Tuple[Callable[..., bool], tuple]] = None
+        # number of cycles since the last change of the checks
+        self.unchanged = 0
+        # destination of the failures, which a derived runtime can replace
+        self.sink = FailureSink()
+        # statistics of the result
+        self.evaluations = 0
+        self.failure_count = 0
+        self.start_time = time.perf_counter()
+        self.result: Optional[Result] = None
 
         print('========================')
         print('Operator: {}'.format(operator))
         print('Procedure: {}\n'.format(procedure_name))
 
-    def close(self):
-        """Close the runtime."""
+    def close(self) -> Result:
+        """Close the runtime and return the result of the scenario."""
+        self.sink.close()
         print('Test result: {}'.format('passed' if self.test_result else 'failed'))
         print('========================')
+        duration = time.perf_counter() - self.start_time
+        steps = self.step - 1
+        self.result = Result(
+            self.operator,
+            self.procedure_name,
+            self.test_result,
+            steps,
+            self.evaluations,
+            self.failure_count,
+            duration,
+            duration / steps if steps else 0.0,
+        )
+        return self.result
 
     def cycle(self, cycles: int):
-        """Run the test for a number of cycles."""
+        """
+        Run the test for a number of cycles.
+
+        The cycles without checks are run by ``run_cycles``, without calling ``check_values``.
+        """
+        # self.root does not have an abstraction that declares call_cycle
+        call_cycle = self.root.call_cycle  # type: ignore
+        check_values = self.check_values
         for cycle in range(cycles):
+            if not self.checks:
+                self.run_cycles(cycles - cycle)
+                return
             # print("Step {}".format(self.step))
-            # self.root does not have an abstraction that declares call_cycle
-            self.root.call_cycle()  # type: ignore
-            self.check_values()
+            self.evaluations += len(self.checks)
+            call_cycle()
+            check_values()
             self.step += 1
 
+    def run_cycles(self, cycles: int):
+        """
+        Run a number of cycles without checks.
+
+        The cycles are run at once by the root's ``call_cycles`` when it is
+        defined, for example a loop in C, otherwise one after the other.
+        """
+        call_cycles = getattr(self.root, 'call_cycles', None)
+        if call_cycles:
+            call_cycles(cycles)
+        else:
+            call_cycle = self.root.call_cycle  # type: ignore
+            for _ in range(cycles):
+                call_cycle()
+        self.step += cycles
+        self.unchanged += cycles
+        # the remaining expiries refer to removed checks
+        self.expiries.clear()
+
+    def set_value(self, target: object, path: str, value: object):
+        """
+        Assign a value to an input, designated by a path relative to the target object.
+
+        The value of an array or a structure is a sequence or a mapping,
+        assigned with ``assign``.
+        """
+        elements = parse_path(path)
+        for is_index, key in elements[:-1]:
+            target = target[key] if is_index else getattr(target, key)  # type: ignore
+        is_index, key = elements[-1]
+        if isinstance(value, (tuple, list, dict)):
+            assign(target[key] if is_index else getattr(target, key), value)  # type: ignore
+        elif is_index:
+            target[key] = value  # type: ignore
+        else:
+            setattr(target, key, value)  # type: ignore
+
+    def load_steps(self, text: str) -> List[list]:
+        """
+        Return the table of steps of a scenario, written as JSON lines.
+
+        Parameters
+        ----------
+        text : str
+            One row ``[sets, checks, unchecks, cycles]`` per line, see ``run_steps``.
+
+        Returns
+        -------
+        List[list]
+        """
+        # the parsing creates many containers, none of them garbage: the
+        # collections it would trigger cost more than the parsing itself
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return json.loads('[%s]' % ','.join(text.splitlines()))
+        finally:
+            if enabled:
+                gc.enable()
+
+    def run_steps(self, targets: Tuple[object, ...], steps: Iterable[tuple]):
+        """
+        Run a scenario defined as a table of steps.
+
+        Parameters
+        ----------
+        targets : Tuple[object, ...]
+            Objects the set actions refer to by index, usually ``root`` and ``sensors``.
+        steps : Iterable[tuple]
+            Rows ``(sets, checks, unchecks, cycles)``, where ``sets`` contains
+            ``(target, path, value)`` and ``checks`` contains
+            ``(name, expected, sustain, tolerance, filter)``.
+        """
+        for sets, checks, unchecks, cycles in steps:
+            for target, path, value in sets:
+                self.set_value(targets[target], path, value)
+            for name, expected, sustain, tolerance, filter_ in checks:
+                self.check(name, expected, sustain, tolerance, filter_)
+            for name in unchecks:
+                self.uncheck(name)
+            if cycles:
+                self.cycle(cycles)
+
     def check(
         self, name: str, expected: object, sustain: int = 1, tolerance: float = 0, filter_: str = ''
     ):
@@ -76,45 +673,645 @@ class Thgrt:
 
         A negative value for tolerance means relative tolerance, otherwise the
         tolerance is considered as absolute.
+
+        The expected value of an array is a sequence, possibly nested: the
+        array is checked as a whole and the failures are reported per element.
         """
-        self.checks[name] = Check(expected, sustain, tolerance, filter_)
+        if isinstance(expected, (tuple, list)):
+            check = ArrayCheck(expected, sustain, tolerance, filter_)
+        else:
+            check = Check(expected, sustain, tolerance, filter_)
+        check.read = get_accessor(name)
+        self.checks[name] = check
+        self.evaluator = None
+        self.unchanged = 0
+        if sustain == 1:
+            # most frequent case, see expire_checks
+            self.one_shots[name] = check
+            return
+        if self.one_shots:
+            self.one_shots.pop(name, None)
+        if sustain > 0:
+            # the check is evaluated during sustain cycles, this one included
+            step = self.step + sustain - 1
+            check.expiry = step
+            expired = self.expiries.get(step)
+            if expired is None:
+                self.expiries[step] = [name]
+            else:
+                expired.append(name)
 
     def uncheck(self, name: str):
         """Uncheck a value."""
         try:
             self.checks.pop(name)
+            self.one_shots.pop(name, None)
         except KeyError as e:
+            self.sink.flush()
             print(str(e))
+        self.evaluator = None
+        self.unchanged = 0
 
     def check_values(self):
         """Check the values."""
-        # flush all checks and remove those which are no longer valid
-        to_remove = []
-        for name, check in self.checks.items():
-            value = getattr(self.root, name)
+        evaluator = self.evaluator
+        if evaluator is None and self.evaluator_threshold is not None:
+            if self.unchanged >= self.evaluator_threshold:
+                checks = self.checks
+                signature = tuple((name, check.compare is None) for name, check in checks.items())
+                evaluator = compile_evaluator(signature), tuple(checks.values())
+                self.evaluator = evaluator
+        if evaluator:
+            function, arguments = evaluator
+            passed = function(self.root, arguments, self.log_failure, self.step)
+            self.test_result = self.test_result and passed
+        else:
+            self.interpret_checks()
+        self.unchanged += 1
+        self.expire_checks()
 
-            if math.isnan(check.expected):
-                passed = math.isnan(value)
-            elif check.tolerance < 0:
-                passed = math.isclose(value, check.expected, rel_tol=-check.tolerance, abs_tol=0)
+    def expire_checks(self):
+        """Remove the checks which sustain is over."""
+        # unless they have been removed or registered again since
+        one_shots = self.one_shots
+        if one_shots:
+            checks = self.checks
+            if len(one_shots) == len(checks):
+                # the one-shots are all the checks
+                checks.clear()
             else:
-                passed = math.isclose(value, check.expected, rel_tol=0, abs_tol=check.tolerance)
-
-            # print only failed checks for clarity
-            if not passed:
-                self.log_failure(self.step, name, value, check.expected)
-            self.test_result = self.test_result and passed
+                for name in one_shots:
+                    del checks[name]
+            one_shots.clear()
+            self.evaluator = None
+            self.unchanged = 0
+        step = self.step
+        expired = self.expiries.pop(step, None)
+        if expired:
+            checks = self.checks
+            for name in expired:
+                check = checks.get(name)
+                if check is not None and check.expiry == step:
+                    del checks[name]
+                    self.evaluator = None
+                    self.unchanged = 0
 
-            if check.sustain == 1:
-                to_remove.append(name)
-            elif check.sustain != -1:
-                check.sustain -= 1
+    def interpret_checks(self):
+        """Check the values, one check after the other."""
+        root = self.root
+        for name, check in self.checks.items():
+            value = check.read(root)
 
-        for name in to_remove:
-            self.checks.pop(name)
+            compare_ = check.compare
+            if compare_:
+                passed = compare_(value)
+                # print only failed checks for clarity
+                if not passed:
+                    self.log_failure(self.step, name, value, check.expected)
+            else:
+                failures = check.get_failures(value)  # type: ignore
+                for suffix, actual, expected in failures:
+                    self.log_failure(self.step, name + suffix, actual, expected)
+                passed = not failures
+            self.test_result = self.test_result and passed
 
     def log_failure(self, step: int, name: str, value, expected):
         """Log a failure."""
-        print(
-            'test failed at step {}: {}={} (expected {})'.format(self.step, name, value, expected)
+        self.failure_count += 1
+        self.sink.report(step, name, value, expected)
+
+
+@lru_cache(maxsize=256)
+def compile_recorder(names: Tuple[str, ...]) -> Callable[[object, tuple], tuple]:
+    """
+    Return a function reading a set of outputs.
+
+    Parameters
+    ----------
+    names : Tuple[str, ...]
+        Paths of the outputs.
+
+    Returns
+    -------
+    Callable[[object, tuple], tuple]
+        Function ``record(root, readers)`` returning the values of the outputs,
+        where ``readers`` are the accessors of the paths which are not valid
+        Python expressions.
+    """
+    items = [
+        get_expression(name, 'root') or 'readers[%d](root)' % i for i, name in enumerate(names)
+    ]
+    # the expressions contain only identifiers, dots and indexes
+    return eval('lambda root, readers: (%s,)' % ', '.join(items))  # nosec B307  # validated paths
+
+
+class DeferredThgrt(Thgrt):
+    """
+    THG runtime evaluating the checks when it is closed.
+
+    The values of the checked outputs are recorded at each cycle into a NumPy
+    array, and the checks are evaluated at once, for all the steps, by
+    ``close``. The failures are reported in the order of the steps, then of
+    the checks, as ``Thgrt`` does, before the result of the test.
+
+    The values are recorded as floats: the integers larger than 2**53 are
+    approximated. The array checks, and all the checks when NumPy is not
+    installed, are evaluated at each cycle, but reported by ``close`` as well.
+    """
+
+    # initial number of steps of the trace, doubled when needed
+    capacity = 1024
+    # maximum number of values compared at once by close
+    batch_size = 1 << 20
+
+    def __init__(self, root: object, operator: str, procedure_name: str):
+        """Initialize the runtime."""
+        super().__init__(root, operator, procedure_name)
+        np = get_numpy()
+        # values of the checked outputs per step and per column, None without NumPy
+        self.trace = np.empty((self.capacity, 8)) if np else None
+        # name -> column of the trace
+        self.columns: Dict[str, int] = {}
+        # column -> type of the recorded values, int or bool, else float
+        self.kinds: Dict[int, type] = {}
+        # registrations of the recorded checks:
+        # [name, expected, tolerance, first step, last step or -1, order, column]
+        self.schedule: List[list] = []
+        # name -> index in the schedule of the registered check
+        self.entries: Dict[str, int] = {}
+        # name -> order of the check, as the order of self.checks
+        self.orders: Dict[str, int] = {}
+        self.order = 0
+        # failures of the checks evaluated at each cycle:
+        # (step, order, name, value, expected)
+        self.pending: List[tuple] = []
+        # recording of the current checks: columns, accessors, recorder and
+        # checks evaluated at each cycle, set when the checks change
+        self.recording: tuple = (None, (), None, [])
+        # columns which type is not known yet, and their position in the record
+        self.untyped: List[Tuple[int, int]] = []
+
+    def close(self) -> Result:
+        """Evaluate the recorded checks, report the failures and close the runtime."""
+        failures = self.pending + self.evaluate_checks()
+        # stable sort: the failures of an array remain in the order of its elements
+        failures.sort(key=itemgetter(0, 1))
+        for step, _, name, value, expected in failures:
+            self.log_failure(step, name, value, expected)
+            self.test_result = False
+        self.pending = []
+        return super().close()
+
+    def check(
+        self, name: str, expected: object, sustain: int = 1, tolerance: float = 0, filter_: str = ''
+    ):
+        """Check a value, recorded at each cycle when it is a scalar."""
+        if name not in self.checks:
+            # a check registered again keeps its position
+            self.order += 1
+            self.orders[name] = self.order
+        self.end_entry(name)
+        super().check(name, expected, sustain, tolerance, filter_)
+        if self.trace is None or not isinstance(expected, (int, float)):
+            return
+        column = self.columns.get(name)
+        if column is None:
+            column = len(self.columns)
+            self.columns[name] = column
+        last = self.step + sustain - 1 if sustain > 0 else -1
+        self.entries[name] = len(self.schedule)
+        self.schedule.append(
+            [name, expected, tolerance, self.step, last, self.orders[name], column]
         )
+
+    def uncheck(self, name: str):
+        """Uncheck a value."""
+        self.end_entry(name)
+        super().uncheck(name)
+
+    def end_entry(self, name: str):
+        """End the schedule of a check before the current step."""
+        index = self.entries.pop(name, None)
+        if index is not None:
+            entry = self.schedule[index]
+            if entry[4] == -1 or entry[4] >= self.step:
+                entry[4] = self.step - 1
+
+    def record_checks(self):
+        """Prepare the recording of the current checks."""
+        names, columns, immediate = [], [], []
+        for name, check in self.checks.items():
+            if name in self.entries:
+                names.append(name)
+                columns.append(self.columns[name])
+            else:
+                immediate.append((self.orders[name], name, check))
+        if not names:
+            self.recording = (None, (), None, immediate)
+            return
+
+        np = get_numpy()
+        steps, width = self.trace.shape  # type: ignore
+        if len(self.columns) > width:
+            trace = np.empty((steps, max(2 * width, len(self.columns))))
+            trace[:, :width] = self.trace
+            self.trace = trace
+        readers = tuple(self.checks[name].read for name in names)
+        recorder = compile_recorder(tuple(names))
+        if columns == list(range(columns[0], columns[0] + len(columns))):
+            # usual case, the checks are registered in the same order
+            index = slice(columns[0], columns[0] + len(columns))
+        else:
+            index = np.array(columns, dtype=np.intp)
+        self.recording = (index, readers, recorder, immediate)
+        self.untyped = [(i, column) for i, column in enumerate(columns) if column not in self.kinds]
+
+    def check_values(self):
+        """Record the values of the checked outputs."""
+        if self.unchanged == 0:
+            self.record_checks()
+        columns, readers, recorder, immediate = self.recording
+        if columns is not None:
+            row = self.step - 1
+            trace = self.trace
+            if row >= len(trace):  # type: ignore
+                # the cycles without checks are not recorded: the row can be
+                # far beyond the end of the trace
+                np = get_numpy()
+                steps, width = trace.shape  # type: ignore
+                added = np.empty((max(steps, row + 1 - steps), width))
+                trace = np.concatenate((trace, added))
+                self.trace = trace
+            values = recorder(self.root, readers)
+            trace[row, columns] = get_numpy().fromiter(values, float, len(values))  # type: ignore
+            if self.untyped:
+                for i, column in self.untyped:
+                    value = values[i]
+                    self.kinds[column] = type(value) if isinstance(value, int) else float
+                self.untyped = []
+        if immediate:
+            self.evaluate_immediate(immediate)
+        self.unchanged += 1
+        self.expire_checks()
+
+    def evaluate_immediate(self, immediate: List[tuple]):
+        """Evaluate the checks which are not recorded, the failures are reported by close."""
+        root = self.root
+        step = self.step
+        for order, name, check in immediate:
+            value = check.read(root)
+            if check.compare:
+                if not check.compare(value):
+                    self.pending.append((step, order, name, value, check.expected))
+                    self.test_result = False
+            else:
+                failures = check.get_failures(value)
+                for suffix, actual, expected in failures:
+                    self.pending.append((step, order, name + suffix, actual, expected))
+                    self.test_result = False
+
+    def evaluate_checks(self) -> List[tuple]:
+        """
+        Evaluate the recorded checks, for all the steps.
+
+        Returns
+        -------
+        List[tuple]
+            Failures ``(step, order, name, value, expected)``.
+        """
+        if not self.schedule:
+            return []
+        np = get_numpy()
+        names, expecteds, tolerances, firsts, lasts, orders, columns = zip(*self.schedule)
+        end = self.step - 1
+        firsts = np.array(firsts, dtype=np.int64)
+        lasts = np.array(lasts, dtype=np.int64)
+        lasts = np.where((lasts == -1) | (lasts > end), end, lasts)
+        lengths = np.maximum(lasts - firsts + 1, 0)
+        expected = np.array(expecteds, dtype=float)
+        tolerance = np.array(tolerances, dtype=float)
+        columns = np.array(columns, dtype=np.intp)
+        ends = np.cumsum(lengths)
+
+        failures = []
+        start = 0
+        while start < len(lengths):
+            # batch of entries, with at most batch_size values unless an entry is larger
+            offset = ends[start - 1] if start else 0
+            stop = max(int(np.searchsorted(ends, offset + self.batch_size, 'right')), start + 1)
+            counts = lengths[start:stop]
+            entries = np.repeat(np.arange(start, stop), counts)
+            start = stop
+            if not entries.size:
+                continue
+            rows = firsts[entries] - 1
+            rows += np.arange(entries.size) - np.repeat(np.cumsum(counts) - counts, counts)
+            # the trace is contiguous
+            actual = self.trace.take(rows * self.trace.shape[1] + columns[entries])  # type: ignore
+            passed = _isclose(np, actual, expected[entries], tolerance[entries])
+            for k in np.flatnonzero(~passed):
+                entry = int(entries[k])
+                value = actual[k].item()
+                if math.isfinite(value):
+                    # the type of the output, unless it cannot hold the value, e.g. NaN
+                    value = self.kinds.get(int(columns[entry]), float)(value)
+                failures.append(
+                    (int(rows[k]) + 1, orders[entry], names[entry], value, expecteds[entry])
+                )
+        return failures
+
+
+# last value of the checks not evaluated yet, different from any value
+_unset = object()
+
+
+@lru_cache(maxsize=256)
+def compile_change_evaluator(signature: Tuple[Tuple[str, str], ...]) -> Callable[..., tuple]:
+    """
+    Return a function evaluating a set of checks when their outputs change.
+
+    Parameters
+    ----------
+    signature : Tuple[Tuple[str, str], ...]
+        Names of the checks, and their kinds: ``array``, ``forever`` for the
+        checks sustained for ever, or ``finite``.
+
+    Returns
+    -------
+    Callable[..., tuple]
+        Function ``evaluate(root, checks, states, log_failure, step)``,
+        returning whether all the checks passed and the number of comparisons.
+        The states are the lists ``[last value, last verdict, failures]``.
+    """
+    lines = ['def evaluate(root, checks, states, log_failure, step):']
+    if signature:
+        lines.append('    %s, = checks' % ', '.join('c%d' % i for i in range(len(signature))))
+        lines.append('    %s, = states' % ', '.join('s%d' % i for i in range(len(signature))))
+    lines.append('    passed = True')
+    lines.append('    evaluated = 0')
+    for i, (name, kind) in enumerate(signature):
+        lines.append('    value = %s' % (get_expression(name, 'root') or 'c%d.read(root)' % i))
+        if kind == 'array':
+            lines.append('    evaluated += 1')
+            lines.append('    failures = c%d.get_failures(value)' % i)
+            lines.append('    if failures:')
+            lines.append('        passed = False')
+            lines.append('        for suffix, actual, expected in failures:')
+            lines.append('            log_failure(step, %r + suffix, actual, expected)' % name)
+            continue
+        # the verdict is the same for equal values, for example 1 and 1.0,
+        # and for NaN values, which are not equal
+        lines.append('    if value != s%d[0] and (value == value or s%d[0] == s%d[0]):' % (i, i, i))
+        lines.append('        evaluated += 1')
+        lines.append('        s%d[0] = value' % i)
+        lines.append('        s%d[1] = c%d.compare(value)' % (i, i))
+        if kind == 'forever':
+            # a failure is reported once per value
+            lines.append('        if not s%d[1]:' % i)
+            lines.append('            log_failure(step, %r, value, c%d.expected)' % (name, i))
+        lines.append('    if not s%d[1]:' % i)
+        lines.append('        passed = False')
+        if kind == 'forever':
+            lines.append('        s%d[2] += 1' % i)
+        else:
+            lines.append('        log_failure(step, %r, value, c%d.expected)' % (name, i))
+    lines.append('    return passed, evaluated')
+    namespace = {}
+    code = compile('\n'.join(lines), '<change evaluator>', 'exec')
+    exec(code, namespace)  # nosec B102  # generated from validated paths
+    return namespace['evaluate']
+
+
+class ChangeDrivenThgrt(Thgrt):
+    """
+    THG runtime comparing the outputs only when they change.
+
+    The runtime keeps the last value and the last verdict of each scalar
+    check, and reuses the verdict while neither the value nor the check
+    changes. The checks sustained for ever report their first failure for a
+    given value only, then the number of cycles they passed and failed when
+    they are removed, registered again, or when the runtime is closed.
+    """
+
+    # the checks are evaluated with the functions of compile_change_evaluator
+    evaluator_threshold = None
+
+    def __init__(self, root: object, operator: str, procedure_name: str):
+        """Initialize the runtime."""
+        super().__init__(root, operator, procedure_name)
+        # name -> check and its state, [last value, last verdict, failures]
+        self.states: Dict[str, Tuple[Check, list]] = {}
+        # name -> step of the registration of the checks sustained for ever
+        self.starts: Dict[str, int] = {}
+        # function evaluating the current checks, and its arguments
+        self.evaluation: tuple = (None, (), ())
+        # number of comparisons
+        self.evaluated = 0
+
+    @property
+    def skipped(self) -> int:
+        """Return the number of comparisons skipped since the outputs did not change."""
+        return self.evaluations - self.evaluated
+
+    def close(self) -> Result:
+        """Report the counts of the remaining checks and close the runtime."""
+        for name in list(self.starts):
+            self.end_count(name)
+        self.sink.emit('Comparisons: {} evaluated, {} skipped'.format(self.evaluated, self.skipped))
+        return super().close()
+
+    def check(
+        self, name: str, expected: object, sustain: int = 1, tolerance: float = 0, filter_: str = ''
+    ):
+        """Check a value."""
+        self.end_count(name)
+        super().check(name, expected, sustain, tolerance, filter_)
+        if sustain <= 0 and self.checks[name].compare:
+            self.starts[name] = self.step
+
+    def uncheck(self, name: str):
+        """Uncheck a value."""
+        self.end_count(name)
+        super().uncheck(name)
+
+    def end_count(self, name: str):
+        """Report the counts of a check sustained for ever, if any."""
+        start = self.starts.pop(name, None)
+        if start is not None:
+            check, state = self.states.get(name, (None, [_unset, True, 0]))
+            failed = state[2] if check is self.checks[name] else 0
+            self.log_counts(name, self.step - start - failed, failed)
+
+    def check_values(self):
+        """Check the values which changed since the last cycle."""
+        if self.unchanged == 0:
+            signature = []
+            states = []
+            for name, check in self.checks.items():
+                if not check.compare:
+                    kind = 'array'
+                else:
+                    kind = 'forever' if check.sustain <= 0 else 'finite'
+                signature.append((name, kind))
+                state = self.states.get(name)
+                if state is None or state[0] is not check:
+                    state = check, [_unset, True, 0]
+                    self.states[name] = state
+                states.append(state[1])
+            function = compile_change_evaluator(tuple(signature))
+            self.evaluation = function, tuple(self.checks.values()), tuple(states)
+        function, checks, states = self.evaluation
+        passed, evaluated = function(self.root, checks, states, self.log_failure, self.step)
+        self.test_result = self.test_result and passed
+        self.evaluated += evaluated
+        self.unchanged += 1
+        self.expire_checks()
+
+    def log_counts(self, name: str, passed: int, failed: int):
+        """Log the number of cycles a check sustained for ever passed and failed."""
+        self.sink.emit('check {}: passed {} times, failed {} times'.format(name, passed, failed))
+
+
+class Metrics:
+    """Timers, in nanoseconds, and counters of a runtime."""
+
+    def __init__(self):
+        """Initialize the metrics."""
+        # cumulated durations of the calls to call_cycle, check_values and
+        # set_value, and of the scenario's statements between the cycles
+        self.call_cycle = 0
+        self.check_values = 0
+        self.set_value = 0
+        self.script = 0
+        # duration of each step: call_cycle and check_values
+        self.latencies = array('q')
+        # number of checks registered, evaluated and expired
+        self.registered = 0
+        self.evaluated = 0
+        self.expired = 0
+
+    def percentiles(self, percents: Iterable[float]) -> List[int]:
+        """Return percentiles of the durations of the steps, with the nearest-rank method."""
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return [0 for _ in percents]
+        return [
+            latencies[max(math.ceil(percent / 100 * len(latencies)) - 1, 0)] for percent in percents
+        ]
+
+    def histogram(self) -> Dict[int, int]:
+        """Return the number of steps per duration, the keys being the powers of two above them."""
+        histogram: Dict[int, int] = {}
+        for latency in self.latencies:
+            bound = 1 << latency.bit_length()
+            histogram[bound] = histogram.get(bound, 0) + 1
+        return dict(sorted(histogram.items()))
+
+    def as_dict(self) -> dict:
+        """Return the timers, the percentiles and the counters."""
+        p50, p90, p99, p100 = self.percentiles([50, 90, 99, 100])
+        return {
+            'call_cycle': self.call_cycle,
+            'check_values': self.check_values,
+            'set_value': self.set_value,
+            'script': self.script,
+            'steps': len(self.latencies),
+            'p50': p50,
+            'p90': p90,
+            'p99': p99,
+            'max': p100,
+            'registered': self.registered,
+            'evaluated': self.evaluated,
+            'expired': self.expired,
+        }
+
+    def summary(self) -> List[str]:
+        """Return the lines summarizing the metrics."""
+        data = self.as_dict()
+        return [
+            'Metrics:',
+            '    time (ms): call_cycle {:.3f}, check_values {:.3f}, set_value {:.3f}, '
+            'script {:.3f}'.format(
+                *(data[_] / 1e6 for _ in ['call_cycle', 'check_values', 'set_value', 'script'])
+            ),
+            '    step (us): p50 {:.3f}, p90 {:.3f}, p99 {:.3f}, max {:.3f}'.format(
+                *(data[_] / 1e3 for _ in ['p50', 'p90', 'p99', 'max'])
+            ),
+            '    checks: {} registered, {} evaluated, {} expired'.format(
+                self.registered, self.evaluated, self.expired
+            ),
+        ]
+
+
+class MetricsThgrt(Thgrt):
+    """
+    THG runtime measuring where the time goes.
+
+    The runtime times ``call_cycle``, ``check_values``, ``set_value`` and the
+    scenario's statements between the cycles, records the duration of each
+    step, and counts the checks registered, evaluated and expired. The
+    metrics are available in the attribute ``metrics`` and summarized by
+    ``close``. The cycles are run one by one, ``call_cycles`` is not used.
+
+    The methods call ``super()``, so that the class can be combined with
+    another runtime, for example ``class Runtime(MetricsThgrt, DeferredThgrt)``.
+    """
+
+    def __init__(self, root: object, operator: str, procedure_name: str):
+        """Initialize the runtime."""
+        super().__init__(root, operator, procedure_name)
+        self.metrics = Metrics()
+        # end of the last cycle, for timing the statements between the cycles
+        self.last_cycle = time.perf_counter_ns()
+
+    def close(self) -> Result:
+        """Summarize the metrics and close the runtime."""
+        metrics = self.metrics
+        metrics.evaluated = self.evaluations
+        metrics.script += time.perf_counter_ns() - self.last_cycle
+        self.sink.flush()
+        for line in metrics.summary():
+            print(line)
+        return super().close()
+
+    def cycle(self, cycles: int):
+        """Run the test for a number of cycles, timing each step."""
+        clock = time.perf_counter_ns
+        metrics = self.metrics
+        latencies = metrics.latencies
+        start = clock()
+        metrics.script += start - self.last_cycle
+        call_cycle = self.root.call_cycle  # type: ignore
+        check_values = self.check_values
+        for _ in range(cycles):
+            start = clock()
+            call_cycle()
+            called = clock()
+            if self.checks:
+                self.evaluations += len(self.checks)
+                check_values()
+            checked = clock()
+            metrics.call_cycle += called - start
+            metrics.check_values += checked - called
+            latencies.append(checked - start)
+            self.step += 1
+        self.last_cycle = clock()
+
+    def set_value(self, target: object, path: str, value: object):
+        """Assign a value to an input, timing the assignment."""
+        start = time.perf_counter_ns()
+        super().set_value(target, path, value)
+        self.metrics.set_value += time.perf_counter_ns() - start
+
+    def check(
+        self, name: str, expected: object, sustain: int = 1, tolerance: float = 0, filter_: str = ''
+    ):
+        """Check a value, counting the registrations."""
+        self.metrics.registered += 1
+        super().check(name, expected, sustain, tolerance, filter_)
+
+    def expire_checks(self):
+        """Remove the checks which sustain is over, counting them."""
+        count = len(self.checks)
+        super().expire_checks()
+        self.metrics.expired += count - len(self.checks)
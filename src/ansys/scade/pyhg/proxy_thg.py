@@ -20,7 +20,16 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-"""Provides a proxy to the ``thg`` module for unit testing."""
+"""
+Provides a proxy to the ``thg`` module for unit testing.
+
+The proxy forwards the calls to the selected parser:
+
+* ``thg``: The module embedded in SCADE Test, default when available.
+* ``ssm``: The pure-Python SSM parser, for generating the harness outside of SCADE.
+* ``''``: No parser, the scenarios are considered empty. This is the default
+  for unit testing.
+"""
 
 try:
     # this module is dynamic and exists only during the execution of SCADE THG
@@ -29,6 +38,49 @@ except ModuleNotFoundError:
     # unit tests
     _thg = None
 
+# selected parser: either the thg module or an instance of SsmParser
+_parser = _thg
+_parser_name = 'thg' if _thg else ''
+
+
+def select(name: str):
+    """
+    Select the parser to use for the next scenarios.
+
+    Parameters
+    ----------
+    name : str
+        Name of the parser, either ``thg``, ``ssm``, or empty for none.
+    """
+    global _parser, _parser_name
+
+    if name == 'thg':
+        if not _thg:
+            raise ValueError('thg: module not available outside of SCADE Test')
+        _parser = _thg
+    elif name == 'ssm':
+        from ansys.scade.pyhg.ssm import SsmParser
+
+        _parser = SsmParser()
+    elif not name:
+        _parser = None
+    else:
+        raise ValueError('%s: unknown parser' % name)
+    _parser_name = name
+
+
+def reset():
+    """Select the default parser, ``thg`` when available, else none."""
+    global _parser, _parser_name
+
+    _parser = _thg
+    _parser_name = 'thg' if _thg else ''
+
+
+def selected() -> str:
+    """Return the name of the selected parser."""
+    return _parser_name
+
 
 def open(pathname: str, is_init: bool, client_data: object) -> bool:
     """
@@ -48,7 +100,7 @@ def open(pathname: str, is_init: bool, client_data: object) -> bool:
     bool
         Whether the function open is successful.
     """
-    return _thg.open(pathname, is_init, client_data) if _thg else True
+    return _parser.open(pathname, is_init, client_data) if _parser else True
 
 
 def parse() -> bool:
@@ -63,10 +115,10 @@ def parse() -> bool:
     bool
         False when the end of the parsed scenario is reached, True otherwise.
     """
-    return _thg.parse() if _thg else False
+    return _parser.parse() if _parser else False
 
 
 def close():
     """Request THG to close the scenario."""
-    if _thg:
-        _thg.close()
+    if _parser:
+        _parser.close()
@@ -22,25 +22,55 @@
 
 """SCADE Test Harness Generator for Python."""
 
+from collections import Counter
 from io import TextIOBase
+import json
 from keyword import iskeyword
+import os
 from pathlib import Path
 import re
-from typing import Optional, Union
-
-from scade.code.suite.mapping import c, model as m
-from scade.model.project.stdproject import Configuration, Project
-from scade.model.testenv import Procedure, Record
-
-from ansys.scade.pyhg import __version__
+from typing import TYPE_CHECKING, NamedTuple, Optional, Union
+
+import ansys.scade.pyhg
+from ansys.scade.pyhg.actions import (
+    Action,
+    BulkSetAction,
+    CheckAction,
+    CommentAction,
+    CycleAction,
+    SetAction,
+    Stage,
+    UncheckAction,
+    create_pipeline,
+)
+from ansys.scade.pyhg.backends import Backend, ScriptBackend, create_backend
+from ansys.scade.pyhg.emitter import Emitter, create_emitter
 import ansys.scade.pyhg.proxy_thg as thg
 from ansys.scade.pyhg.values import flatten
 
+if TYPE_CHECKING:
+    # the scade modules are imported on demand, since they are available
+    # only in the SCADE environment, and are not needed for importing
+    # this module, for example in the worker processes
+    from scade.code.suite.mapping import c, model as m
+    from scade.model.project.stdproject import Configuration, Project
+    from scade.model.testenv import Procedure
+
 # ---------------------------------------------------------------------------
 # Generator
 # ---------------------------------------------------------------------------
 
-banner = 'PyHG ' + __version__
+
+def get_banner() -> str:
+    """Return the banner of the generator, including its version."""
+    return 'PyHG ' + ansys.scade.pyhg.__version__
+
+
+def __getattr__(name: str) -> str:
+    """Return the banner, computed on demand for compatibility."""
+    if name == 'banner':
+        return get_banner()
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
 
 
 class PyHG:
@@ -53,6 +83,10 @@ class PyHG:
         self.runtime = 'ansys.scade.pyhg.lib.thgrt.Thgrt'
         self.class_ = ''
         self.procedure = None
+        self.operator_path = ''
+        self.procedure_name = ''
+        # <header>/<name> of the generated operator
+        self.generated = ''
         # path -> name
         self.inputs = {}
         self.outputs = {}
@@ -60,46 +94,96 @@ class PyHG:
         self.probes = {}
         # alias -> path
         self.aliases = {}
+        # path -> IoInfo, for all the I/Os
+        self.ios = {}
+        # dip -> (path, projection, IoInfo), for the current aliases
+        self.resolved_dips = {}
         # output file descriptor
-        self.f: Union[None, TextIOBase] = None
+        self.f: Union[None, TextIOBase, Emitter] = None
+        # kind of emitter for the generated files
+        self.emitter = 'file'
+        # format of the generated files and corresponding backend
+        self.format = 'script'
+        self.backend: Backend = ScriptBackend(self)
+        # minimum number of statements per function for the format functions
+        self.chunk_size = 0
+        # minimum number of elements of the arrays assigned or checked as a whole, 0 for none
+        self.bulk_size = 0
+        # optimization of the actions before they are rendered by the backend
+        self.optimize = False
+        self.pipeline: Stage = create_pipeline(self.render_action, self.optimize)
         # flatten names for a single check
         self.flatten_checks = {}
         # tolerances
         self.tolerances = {}
         # math used for special real values
         self.math_used = False
+        # number of worker processes, 0 for one per CPU
+        self.jobs = 1
+        # skip the records which inputs did not change since the last generation
+        self.incremental = False
+        # byte-compile the generated scripts
+        self.compile = False
+        # init and preamble scenarios shared by several records
+        self.shared_scenarios = set()
+        # (pathname, is_init) -> actions of a shared scenario, parsed once
+        self.scenario_actions = {}
 
     def main(
         self,
         target: str,
-        project: Project,
-        configuration: Configuration,
-        procedure: Procedure,
+        project: 'Project',
+        configuration: 'Configuration',
+        procedure: 'Procedure',
         kcg_target_dir: Path,
         target_dir: Path,
         *args: str,
     ):
         """Generate the test harness for the procedure."""
+        # the parser selected by a previous generation, if any, does not apply
+        thg.reset()
         # options
         for arg in args:
-            param, value = arg.split(maxsplit=1)
+            param, _, value = arg.strip().partition(' ')
+            value = value.strip()
             if param == '-module_name':
                 self.module = value
             elif param == '-runtime_class':
                 self.runtime = value
+            elif param == '-parser':
+                thg.select(value)
+            elif param == '-jobs':
+                self.jobs = int(value)
+            elif param == '-incremental':
+                self.incremental = True
+            elif param == '-emitter':
+                self.emitter = value
+            elif param == '-format':
+                self.format = value
+            elif param == '-chunk_size':
+                self.chunk_size = int(value)
+            elif param == '-bulk_size':
+                self.bulk_size = int(value)
+            elif param == '-optimize':
+                self.optimize = True
+            elif param == '-compile':
+                self.compile = True
 
         if not self.module:
             self.module = Path(project.pathname).stem.lower()
 
         self.procedure = procedure
+        self.operator_path = procedure.operator
+        self.procedure_name = procedure.name
         # remove the status file, is exists
         status_file = target_dir / 'thg_files.txt'
         status_file.unlink(missing_ok=True)
-        # list of generated files
-        generated_files = []
 
         # load the kcg mapping data from kcg generation directory
-        mapping = c.open_mapping((Path(kcg_target_dir) / 'mapping.xml').as_posix())
+        mapping_file = Path(kcg_target_dir) / 'mapping.xml'
+        from scade.code.suite.mapping import c
+
+        mapping = c.open_mapping(mapping_file.as_posix())
 
         # search the mapping data for the procedure's operator
         operator = self.get_operator(mapping, procedure.operator)
@@ -108,46 +192,159 @@ class PyHG:
         # class for the operator
         name = operator.get_name()
         self.class_ = name[0].upper() + name[1:]
+        self.generated = '{0}/{1}'.format(
+            operator.get_generated().get_header_name(), operator.get_generated().get_name()
+        )
         # init the io dictionary
         self.init_ios(mapping, operator)
 
-        # process the records: dump the semantic actions from the callbacks
-        # (above on_xxx functions)
-        for record in gen_procedure_records(procedure):
-            print(
-                '=== record {0} for {1}/{2}'.format(
-                    record.name,
-                    operator.get_generated().get_header_name(),
-                    operator.get_generated().get_name(),
-                )
-            )
+        # records to generate: name, target file and scenarios, in a form
+        # that can be sent to worker processes
+        records = list(gen_procedure_records(procedure))
+        # the init and preamble scenarios are usually shared by the records:
+        # parse them only once
+        counts = Counter(_.pathname for record in records for _ in record.inits)
+        counts.update(_.pathname for record in records for _ in record.preambles)
+        self.shared_scenarios = {pathname for pathname, count in counts.items() if count > 1}
+        jobs = []
+        for record in records:
             # assume one generated file per record
             target_scenario = target_dir / ('%s_%s.py' % (procedure.name, record.name)).lower()
-            self.math_used = False  # side effect
-            with target_scenario.open('w') as self.f:
-                self.start_scenario()
-                for scenario, is_init in gen_record_scenarios(record):
-                    pathname = scenario.pathname
-                    # if thg.open(pathname, is_init, self.f):
-                    if thg.open(pathname, is_init, self):
-                        while thg.parse():
-                            pass
-                        thg.close()
-                self.close_scenario()
-            if self.math_used:
-                # patch the scenario to import math
-                lines = target_scenario.read_text().splitlines(keepends=True)
-                with target_scenario.open('w') as f:
-                    # write banner
-                    f.writelines(lines[0])
-                    f.write('\nimport math\n')
-                    f.writelines(lines[1:])
-            generated_files.append(target_scenario.name)
+            scenarios = [(_.pathname, is_init) for _, is_init in gen_record_scenarios(record)]
+            jobs.append((record.name, target_scenario, scenarios))
+        generated_files = [target_scenario.name for _, target_scenario, _ in jobs]
+        if self.compile:
+            # the byte code is listed after the scripts
+            generated_files.extend(
+                _bytecode_path(target_scenario).relative_to(target_dir).as_posix()
+                for _, target_scenario, _ in jobs
+            )
+
+        if self.incremental:
+            # options which do not impact the generated files are not considered
+            options = [
+                _.strip()
+                for _ in args
+                if _.strip().partition(' ')[0] not in {'-jobs', '-incremental'}
+            ]
+            manifest = Manifest(target_dir / 'thg_manifest.json')
+            manifest.load(
+                {
+                    'version': ansys.scade.pyhg.__version__,
+                    'options': [self.module, *options],
+                    # written into the scripts
+                    'operator': self.operator_path,
+                    'procedure': self.procedure_name,
+                    'mapping': manifest.digest(str(mapping_file)),
+                }
+            )
+            # is_up_to_date registers the records in the manifest: call it first
+            jobs = [
+                job
+                for job in jobs
+                if not manifest.is_up_to_date(job[1], job[2])
+                or (self.compile and not _bytecode_path(job[1]).exists())
+            ]
+
+        # process the records: dump the semantic actions from the callbacks
+        # (above on_xxx functions)
+        jobs_count = self.jobs if self.jobs > 0 else os.cpu_count() or 1
+        if jobs_count > 1 and len(jobs) > 1 and thg.selected() == 'thg':
+            print('-jobs {0}: not supported with the thg parser, ignored'.format(self.jobs))
+            jobs_count = 1
+        if jobs_count > 1 and len(jobs) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(
+                max_workers=min(jobs_count, len(jobs)),
+                initializer=_init_worker,
+                initargs=(self, thg.selected()),
+            ) as executor:
+                # consume the results to get the exceptions, if any
+                list(executor.map(_generate_record, jobs))
+        else:
+            for job in jobs:
+                self.generate_record(*job)
+
+        if self.incremental:
+            manifest.save()
 
         # generate the status file
         with status_file.open('w', newline='\n') as fd:
             print('\n'.join(generated_files), file=fd)
 
+    def generate_record(self, name: str, target_scenario: Path, scenarios: list) -> str:
+        """
+        Generate the script for a record.
+
+        Parameters
+        ----------
+        name : str
+            Name of the record.
+        target_scenario : Path
+            Path of the generated script.
+        scenarios : list
+            Pathnames of the scenarios of the record, with their init status.
+
+        Returns
+        -------
+        str
+            Name of the generated file.
+        """
+        print('=== record {0} for {1}'.format(name, self.generated))
+        # the records are independent from each other
+        self.aliases = {}
+        self.resolved_dips = {}
+        self.tolerances = {}
+        self.flatten_checks = {}
+        self.math_used = False  # side effect
+        self.backend = create_backend(self.format, self)
+        self.pipeline = create_pipeline(self.render_action, self.optimize)
+        self.f = emitter = create_emitter(self.emitter, target_scenario)
+        self.start_scenario()
+        for pathname, is_init in scenarios:
+            self.parse_scenario(pathname, is_init)
+        self.close_scenario()
+        if self.math_used:
+            emitter.add_import('math')
+        modified = emitter.close()
+        self.f = None
+        if self.compile and (modified or not _bytecode_path(target_scenario).exists()):
+            compile_script(target_scenario)
+        return target_scenario.name
+
+    def parse_scenario(self, pathname: str, is_init: bool):
+        """
+        Parse a scenario and process its actions.
+
+        The actions of the shared scenarios are recorded the first time and
+        replayed for the next records. The replay calls the same callbacks,
+        so that the generated code considers the current aliases and tolerances.
+        """
+        key = (pathname, is_init)
+        actions = self.scenario_actions.get(key)
+        if actions is not None:
+            for name, args in actions:
+                getattr(self, name)(*args)
+            return
+
+        client_data = ActionRecorder(self) if pathname in self.shared_scenarios else self
+        # if thg.open(pathname, is_init, self.f):
+        if thg.open(pathname, is_init, client_data):
+            while thg.parse():
+                pass
+            thg.close()
+            if isinstance(client_data, ActionRecorder):
+                self.scenario_actions[key] = client_data.actions
+
+    def __getstate__(self) -> dict:
+        """Return the state of the generator to send to the worker processes."""
+        state = self.__dict__.copy()
+        # neither the SCADE objects nor the files can be pickled
+        state['procedure'] = None
+        state['f'] = None
+        return state
+
     def on_cycle(self, line: int, col: int, number: str):
         """Call the cycle action."""
         # print("cycle: {0} {1} {2}".format(line, col, number))
@@ -155,14 +352,14 @@ class PyHG:
             cycles = int(number)
         else:
             cycles = 1
-        self.writeln('thgrt.cycle({})'.format(cycles))
+        self.pipeline.push(CycleAction(cycles))
 
     def on_comment(self, line: int, col: int, text: str):
         """Call the comment action."""
         # print("comment: {0} {1} {2}".format(line, col, text))
         # filter empty comment: parameter always empty with CSV
         if text != '#':
-            self.writeln(text)
+            self.pipeline.push(CommentAction(text))
 
     def on_set_tol(self, line: int, col: int, dip: str, int_tol: str, real_tol: str):
         """Call the set_tol action."""
@@ -172,16 +369,16 @@ class PyHG:
     def on_set(self, line: int, col: int, dip: str, value: object):
         """Call the set action."""
         # print("set: {0} {1} {2} {3}".format(line, col, dip, value))
-        io, projection = self.split_io(dip)
-        path = self.aliases.get(io, io)
-        root = 'sensors' if self.is_sensor(path) else 'root'
-        name = self.resolve_io(path)
-        name = self.filter_keyword(name)
+        root, name, projection = self.resolve_target(dip)
         # value's type annotation incomplete
-        for suffix, literal in flatten(value):  # type: ignore
+        for suffix, literal in flatten(value, self.bulk_size):  # type: ignore
             if 'math.' in literal:
                 self.math_used = True
-            self.writeln('%s.%s%s%s = %s' % (root, name, projection, suffix, literal))
+            if literal[0] == '(':
+                # large array, kept as nested tuples
+                self.pipeline.push(BulkSetAction(root, name + projection + suffix, literal))
+            else:
+                self.pipeline.push(SetAction(root, name + projection + suffix, literal))
 
     def on_check(
         self,
@@ -197,38 +394,27 @@ class PyHG:
         """Call the check action."""
         # print("check: {0} {1} {2} {3} {4} {5} {6} {7}".format(line, col, dip, value, sustain, int_tol, real_tol, filter))
         # register the check
-        args = ''
         if sustain == 'forever':
             n_sustain = -1
         elif not sustain:
             n_sustain = 1
         else:
             n_sustain = int(sustain)
-        if n_sustain != 1:
-            args += f', sustain={n_sustain}'
         if not real_tol:
             real_tol = self.tolerances.get(dip, self.tolerances.get(''))
         if real_tol and real_tol[-1] in 'r%':
             # store relative tolerance as negative values
             real_tol = '-' + real_tol[:-1]
-        arg_tol = f', tolerance={real_tol}' if real_tol else ''
-        if filter_:
-            args += f', filter_={filter_}'
-        io, projection = self.split_io(dip)
-        path = self.aliases.get(io, io)
-        name = self.resolve_io(path)
-        name = self.filter_keyword(name)
+        _, name, projection = self.resolve_target(dip)
         flatten_names = []
         # value's type annotation incomplete
-        for suffix, literal in flatten(value):  # type: ignore
+        for suffix, literal in flatten(value, self.bulk_size):  # type: ignore
             if 'math.' in literal:
                 self.math_used = True
             flatten_name = name + projection + suffix
-            if not arg_tol or literal in {'True', 'False'}:
-                # no tolerance
-                self.writeln(f'thgrt.check("{flatten_name}", {literal}{args})')
-            else:
-                self.writeln(f'thgrt.check("{flatten_name}", {literal}{args}{arg_tol})')
+            # no tolerance for booleans
+            tolerance = '' if not real_tol or literal in {'True', 'False'} else real_tol
+            self.pipeline.push(CheckAction(flatten_name, literal, n_sustain, tolerance, filter_))
             flatten_names.append(flatten_name)
         self.flatten_checks[dip] = flatten_names
 
@@ -236,17 +422,17 @@ class PyHG:
         """Call the uncheck action."""
         # print("uncheck: {0} {1} {2}".format(line, col, dip))
         for flatten_name in self.flatten_checks.get(dip, []):
-            self.writeln(f'thgrt.uncheck("{flatten_name}")')
+            self.pipeline.push(UncheckAction(flatten_name))
 
     def on_set_or_check(self, line: int, col: int, dip: str, value: object):
         """Call the set_or_check action."""
-        io, _ = self.split_io(dip)
-        path = self.aliases.get(io, io)
+        _, _, io = self.resolve_dip(dip)
+        kind = io.kind if io else ''
         # print("set or check: {0} {1} {2} {3}".format(line, col, dip, value))
-        if self.is_input(path):
+        if kind in {'I', 'S'}:
             # print("set: {0} {1} {2} {3}".format(line, col, dip, value))
             self.on_set(line, col, dip, value)
-        elif self.is_output(path):
+        elif kind in {'O', 'P'}:
             # print("check: {0} {1} {2} {3}".format(line, col, dip, value))
             self.on_check(line, col, dip, value, '', '', '', '')
         else:
@@ -256,6 +442,8 @@ class PyHG:
         """Call the alias action."""
         # print("alias: {0} {1} {2} {3}".format(line, col, alias, dip))
         self.aliases[alias] = dip
+        # the resolutions depend on the aliases
+        self.resolved_dips = {}
 
     def on_alias_value(self, line: int, col: int, alias: str, value: object):
         """Call the alias_value action."""
@@ -276,36 +464,23 @@ class PyHG:
 
     def start_scenario(self):
         """Write the header of the scenario."""
-        assert self.procedure  # nosec B101  # addresses linter
-        self.writeln('# generated by %s' % banner)
-        self.writeln('')
-        sensors = ', sensors' if self.sensors else ''
-        self.writeln('from %s import %s%s' % (self.module, self.class_, sensors))
-        # runtime provided as module.class
-        path = self.runtime.split('.')
-        self.writeln('from %s import %s as Thgrt' % ('.'.join(path[:-1]), path[-1]))
-        self.writeln('')
-        self.writeln('# instance of root operator')
-        self.writeln('root = %s()' % (self.class_))
-        self.writeln('')
-        self.writeln('# instance of Thgrt')
-        self.writeln(
-            "thgrt = Thgrt(root, '{}', '{}')".format(self.procedure.operator, self.procedure.name)
-        )
-        self.writeln('')
+        self.backend.start()
 
     def close_scenario(self):
-        """Write the footer of the scenario."""
-        self.writeln('thgrt.close()')
-        self.writeln('# end of file')
+        """Write the pending actions and the footer of the scenario."""
+        self.pipeline.flush()
+        self.backend.close()
+
+    def render_action(self, action: Action):
+        """Render an action leaving the pipeline with the current backend."""
+        action.render(self.backend)
 
     def writeln(self, text: str):
         """Write a line of text to the output file."""
         assert self.f  # nosec B101  # addresses linter
-        self.f.write(text)
-        self.f.write('\n')
+        self.f.write(text + '\n')
 
-    def get_operator(self, mf: c.MappingFile, operator_path: str) -> Optional[m.Operator]:
+    def get_operator(self, mf: 'c.MappingFile', operator_path: str) -> Optional['m.Operator']:
         """Get the operator from the mapping data."""
         # search the mapping data for the procedure's operator
         if operator_path[-1] != '/':
@@ -333,11 +508,11 @@ class PyHG:
 
     def split_io(self, io: str) -> tuple[str, str]:
         """Split the I/O into the path and the projection."""
-        match_ = re.match(r'([^\[\.]*)(.*)', io)
+        match_ = _io_re.match(io)
         assert match_  # nosec B101  # addresses linter
         return (match_.groups()[0], match_.groups()[1])
 
-    def init_ios(self, mf: c.MappingFile, operator: m.Operator):
+    def init_ios(self, mf: 'c.MappingFile', operator: 'm.Operator'):
         """Initialize the I/O dictionaries."""
         # gather all the names in a dictionary
         self.inputs = {_.get_scade_path(): _.get_name() for _ in operator.get_inputs()}
@@ -346,6 +521,44 @@ class PyHG:
         self.sensors = {_.get_scade_path().strip('/'): _.get_name() for _ in mf.get_all_sensors()}
         # TODO: probes from the mapping
         self.probes = {}
+        # index of all the I/Os, with the same precedence as resolve_io
+        self.ios = {}
+        for kind, root, ios in [
+            ('P', 'root', self.probes),
+            ('S', 'sensors', self.sensors),
+            ('O', 'root', self.outputs),
+            ('I', 'root', self.inputs),
+        ]:
+            for path, name in ios.items():
+                self.ios[path] = IoInfo(kind, root, self.filter_keyword(name))
+        self.resolved_dips = {}
+
+    def resolve_dip(self, dip: str) -> tuple[str, str, Optional['IoInfo']]:
+        """
+        Resolve a flow, possibly an alias with a projection.
+
+        The result is cached until the aliases change.
+
+        Returns
+        -------
+        tuple[str, str, Optional[IoInfo]]
+            Path of the I/O, projection, and I/O information or None when unknown.
+        """
+        resolved = self.resolved_dips.get(dip)
+        if resolved is None:
+            io, projection = self.split_io(dip)
+            path = self.aliases.get(io, io)
+            resolved = (path, projection, self.ios.get(path))
+            self.resolved_dips[dip] = resolved
+        return resolved
+
+    def resolve_target(self, dip: str) -> tuple[str, str, str]:
+        """Return the root object, the Python name and the projection of a flow."""
+        path, projection, io = self.resolve_dip(dip)
+        if io:
+            return io.root, io.name, projection
+        # unknown I/O: resolve_io reports the error
+        return 'root', self.filter_keyword(self.resolve_io(path)), projection
 
     def resolve_io(self, path: str) -> str:
         """Resolve the I/O path to a name."""
@@ -369,6 +582,137 @@ class PyHG:
         return '{}_'.format(name) if iskeyword(name) else name
 
 
+class IoInfo(NamedTuple):
+    """Resolution of an I/O."""
+
+    # I (input), O (output), S (sensor) or P (probe)
+    kind: str
+    # Python variable for accessing the I/O: either root or sensors
+    root: str
+    # Python name of the I/O
+    name: str
+
+
+# path and projection of a flow, for example P::Main/v[1].b
+_io_re = re.compile(r'([^\[\.]*)(.*)')
+
+
+def _bytecode_path(script: Path) -> Path:
+    """Return the path of the byte code of a script, where the import system searches it."""
+    from importlib.util import cache_from_source
+
+    return Path(cache_from_source(str(script)))
+
+
+def compile_script(script: Path):
+    """
+    Byte-compile a generated script.
+
+    The byte code is written to the ``__pycache__`` directory of the script,
+    for the version of the running interpreter. It is invalidated by the hash
+    of the source instead of its timestamp, to remain valid when the harness
+    is copied to another location.
+    """
+    import py_compile
+
+    py_compile.compile(
+        str(script),
+        cfile=str(_bytecode_path(script)),
+        doraise=True,
+        invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH,
+    )
+
+
+class ActionRecorder:
+    """Client data forwarding the actions to the generator while recording them."""
+
+    def __init__(self, generator: PyHG):
+        """Initialize the recorder."""
+        self.generator = generator
+        # list of (callback name, arguments)
+        self.actions = []
+
+    def __getattr__(self, name: str):
+        """Return the recording version of the generator's callbacks."""
+        callback = getattr(self.generator, name)
+        if not name.startswith('on_'):
+            return callback
+
+        def record(*args):
+            self.actions.append((name, args))
+            callback(*args)
+
+        return record
+
+
+# ---------------------------------------------------------------------------
+# incremental generation
+# ---------------------------------------------------------------------------
+
+
+class Manifest:
+    """
+    Content hashes of the inputs of the generated files.
+
+    The manifest is stored as a JSON file. A generated file is up to date when
+    the global signature (version, options and mapping) and the contents of
+    its scenarios are the same as for the previous generation.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize the manifest."""
+        self.path = path
+        self.signature = {}
+        # generated file name -> scenarios as [pathname, is_init, digest]
+        self.records = {}
+        # records of the previous generation, when the signature is unchanged
+        self.previous = {}
+        # pathname -> digest
+        self.digests = {}
+
+    def load(self, signature: dict):
+        """Load the previous manifest, if any, and compare the signatures."""
+        self.signature = signature
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        if data.get('signature') == signature:
+            self.previous = data.get('records', {})
+
+    def save(self):
+        """Save the manifest."""
+        data = {'signature': self.signature, 'records': self.records}
+        self.path.write_text(json.dumps(data, indent=2))
+
+    def digest(self, pathname: str) -> str:
+        """Return the hash of a file's content, or an empty string if it can't be read."""
+        digest = self.digests.get(pathname)
+        if digest is None:
+            import hashlib
+
+            hash = hashlib.sha256()
+            try:
+                with open(pathname, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 16), b''):
+                        hash.update(chunk)
+                digest = hash.hexdigest()
+            except OSError:
+                digest = ''
+            self.digests[pathname] = digest
+        return digest
+
+    def is_up_to_date(self, target: Path, scenarios: list) -> bool:
+        """Register the inputs of a generated file and return whether it is up to date."""
+        entry = [[pathname, is_init, self.digest(pathname)] for pathname, is_init in scenarios]
+        self.records[target.name] = entry
+        if all(_[2] for _ in entry) and self.previous.get(target.name) == entry:
+            if target.exists():
+                print('=== {0} is up to date'.format(target.name))
+                return True
+        return False
+
+
 # ---------------------------------------------------------------------------
 # SCADE Test generators
 # ---------------------------------------------------------------------------
@@ -376,6 +720,8 @@ class PyHG:
 
 def gen_container_records(container):
     """Generate the records from a container."""
+    from scade.model.testenv import Record
+
     for element in container.test_elements:
         if isinstance(element, Record):
             yield element
@@ -399,6 +745,28 @@ def gen_record_scenarios(record):
         yield scenario, False
 
 
+# ---------------------------------------------------------------------------
+# worker processes
+# ---------------------------------------------------------------------------
+
+# generator of the worker process
+_worker: Optional[PyHG] = None
+
+
+def _init_worker(generator: PyHG, parser: str):
+    """Initialize a worker process with a copy of the generator."""
+    global _worker
+
+    thg.select(parser)
+    _worker = generator
+
+
+def _generate_record(job: tuple) -> str:
+    """Generate a record in a worker process."""
+    assert _worker  # nosec B101  # addresses linter
+    return _worker.generate_record(*job)
+
+
 # ---------------------------------------------------------------------------
 # interface
 # ---------------------------------------------------------------------------
@@ -406,16 +774,16 @@ def gen_record_scenarios(record):
 
 def thg_main(
     target: str,
-    project: Project,
-    configuration: Configuration,
-    procedure: Procedure,
+    project: 'Project',
+    configuration: 'Configuration',
+    procedure: 'Procedure',
     kcg_target_dir: str,
     target_dir: str,
     *args: str,
 ):
     """Generate the test harness for the procedure."""
     # display some banner
-    print(banner)
+    print(get_banner())
 
     PyHG().main(
         target, project, configuration, procedure, Path(kcg_target_dir), Path(target_dir), *args
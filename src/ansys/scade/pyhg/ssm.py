@@ -0,0 +1,254 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Pure-Python parser for SCADE Test SSM scenarios.
+
+This parser is a stand-in for the ``thg`` module embedded in SCADE Test,
+to generate the test harness outside of SCADE. It supports the subset of
+the SSM commands used by PyHG and calls the same callbacks as ``thg``.
+"""
+
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+# SSM command prefix
+PREFIX = 'SSM::'
+
+
+def _scan(text: str) -> Iterator[Tuple[str, int, bool]]:
+    """
+    Yield the characters of a command line with their context.
+
+    The context of a character is the depth of the parentheses and braces
+    and whether it is in double quotes, before reading the character. The
+    parentheses and braces within double quotes are not counted.
+    """
+    depth = 0
+    quoted = False
+    for char in text:
+        yield char, depth, quoted
+        if quoted:
+            quoted = char != '"'
+        elif char in '({':
+            depth += 1
+        elif char in ')}' and depth > 0:
+            depth -= 1
+        elif char == '"':
+            quoted = True
+
+
+def split_words(text: str) -> List[str]:
+    """
+    Split a command line into words.
+
+    The separators are the blank characters outside of the parentheses,
+    braces or double quotes.
+    """
+    words = []
+    word = ''
+    for char, depth, quoted in _scan(text):
+        if char in ' \t' and depth == 0 and not quoted:
+            if word:
+                words.append(word)
+                word = ''
+        else:
+            word += char
+    if word:
+        words.append(word)
+    return words
+
+
+def unquote(word: str) -> str:
+    """
+    Remove the Tcl quotes of a word, if any.
+
+    The braces of a structured value, for example ``{x: 1, y: 2}``,
+    are not considered as quotes.
+    """
+    if len(word) >= 2 and word[0] == '"' and word[-1] == '"':
+        return word[1:-1]
+    if len(word) >= 2 and word[0] == '{' and word[-1] == '}':
+        inner = word[1:-1]
+        # a ':' outside of nested values, and not part of a '::' path
+        # separator, denotes a structured value
+        depth = 0
+        for i, char in enumerate(inner):
+            if char in '({':
+                depth += 1
+            elif char in ')}':
+                depth -= 1
+            elif char == ':' and depth == 0 and '::' not in inner[i - 1 : i + 2]:
+                return word
+        return inner.strip()
+    return word
+
+
+def is_complete(text: str) -> bool:
+    """Return whether the parentheses and braces of a command, out of quotes, are closed."""
+    # context after the last character
+    depth = 0
+    for _, depth, _ in _scan(text + ' '):
+        pass
+    return depth == 0
+
+
+class SsmParser:
+    """
+    Streaming parser for SSM scenarios.
+
+    The interface is the same as the one of the ``thg`` module: ``open``,
+    ``parse`` and ``close``. Each call to ``parse`` processes one command
+    of the scenario and calls the corresponding method of the client data.
+    """
+
+    def __init__(self):
+        """Initialize the parser."""
+        self.pathname = ''
+        self.is_init = False
+        self.client_data = None
+        self.file: Optional[TextIO] = None
+        self.lines: Optional[Iterator[Tuple[int, str]]] = None
+
+    def open(self, pathname: str, is_init: bool, client_data: object) -> bool:
+        """Open a scenario for reading."""
+        self.close()
+        try:
+            self.file = open(pathname)
+        except OSError as e:
+            print('error: {0}: {1}'.format(pathname, e))
+            return False
+        self.pathname = pathname
+        self.is_init = is_init
+        self.client_data = client_data
+        self.lines = enumerate(self.file, 1)
+        return True
+
+    def close(self):
+        """Close the scenario."""
+        if self.file:
+            self.file.close()
+        self.file = None
+        self.lines = None
+        self.client_data = None
+
+    def parse(self) -> bool:
+        """
+        Parse the next command of the opened scenario.
+
+        Returns
+        -------
+        bool
+            False when the end of the parsed scenario is reached, True otherwise.
+        """
+        if not self.lines:
+            return False
+        for line, text in self.lines:
+            text = text.strip()
+            if not text:
+                continue
+            # join the continuation lines and the multi-line values, except
+            # for the comments which may contain any character
+            while text[0] != '#' and (text.endswith('\\') or not is_complete(text)):
+                next_ = next(self.lines, None)
+                if next_ is None:
+                    break
+                text = text.rstrip('\\').rstrip() + ' ' + next_[1].strip()
+            self.dispatch(line, 1, text)
+            return True
+        return False
+
+    def dispatch(self, line: int, col: int, text: str):
+        """Call the callback corresponding to a command."""
+        cb = self.client_data
+        if text[0] == '#':
+            cb.on_comment(line, col, text)  # type: ignore
+            return
+
+        words = split_words(text)
+        command = words[0]
+        if not command.startswith(PREFIX):
+            cb.on_error(line, col, '%s: unknown command' % command)  # type: ignore
+            return
+        command = command[len(PREFIX) :]
+        args, options = self.parse_args(words[1:])
+
+        def check_args(min_: int, max_: int) -> bool:
+            if min_ <= len(args) <= max_:
+                return True
+            cb.on_error(line, col, '%s: wrong number of arguments' % command)  # type: ignore
+            return False
+
+        if command == 'set':
+            if check_args(2, 2):
+                cb.on_set(line, col, args[0], args[1])  # type: ignore
+        elif command == 'check':
+            if check_args(2, 2):
+                cb.on_check(  # type: ignore
+                    line,
+                    col,
+                    args[0],
+                    args[1],
+                    options.get('sustain', ''),
+                    options.get('int', ''),
+                    options.get('real', ''),
+                    options.get('filter', ''),
+                )
+        elif command == 'uncheck':
+            if check_args(1, 1):
+                cb.on_uncheck(line, col, args[0])  # type: ignore
+        elif command == 'set_or_check':
+            if check_args(2, 2):
+                cb.on_set_or_check(line, col, args[0], args[1])  # type: ignore
+        elif command == 'cycle':
+            if check_args(0, 1):
+                cb.on_cycle(line, col, args[0] if args else '')  # type: ignore
+        elif command in {'set_tolerance', 'set_tol'}:
+            if check_args(0, 1):
+                dip = args[0] if args else options.get('path', '')
+                cb.on_set_tol(  # type: ignore
+                    line, col, dip, options.get('int', ''), options.get('real', '')
+                )
+        elif command == 'alias':
+            if check_args(2, 2):
+                cb.on_alias(line, col, args[0], args[1])  # type: ignore
+        elif command == 'alias_value':
+            if check_args(2, 2):
+                cb.on_alias_value(line, col, args[0], args[1])  # type: ignore
+        else:
+            cb.on_error(line, col, '%s: unknown command' % words[0])  # type: ignore
+
+    def parse_args(self, words: List[str]) -> Tuple[List[str], dict]:
+        """Split the words of a command into positional arguments and options."""
+        args = []
+        options = {}
+        words = list(words)
+        while words:
+            word = words.pop(0)
+            name, sep, value = word.partition('=')
+            if sep and name.isidentifier():
+                # the value may be separated from the '=' by blanks
+                if not value and words:
+                    value = words.pop(0)
+                options[name] = unquote(value)
+            else:
+                args.append(unquote(word))
+        return args, options
@@ -23,30 +23,32 @@
 """Parser for SCADE Test scenario values."""
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from keyword import iskeyword
 import re
-from typing import List, Tuple, Union
-
-from pyparsing import (
-    DelimitedList,
-    Forward,
-    Regex,
-    Suppress,
-    Word,
-    alphanums,
-    alphas,
-)
+from typing import List, Optional, Tuple, Union
 
 
 class Value(ABC):
     """Abstraction for values."""
 
     @abstractmethod
-    def flatten(self, suffix: str, literals: List[Tuple[str, str]]):
-        """Flatten the value."""
+    def flatten(self, suffix: str, literals: List[Tuple[str, str]], min_size: int = 0):
+        """
+        Flatten the value.
+
+        The arrays of at least ``min_size`` elements, made of scalars or of
+        arrays of the same size, are not flattened but rendered as tuples.
+        ``0`` flattens all the arrays.
+        """
         raise NotImplementedError
 
 
+# suffixes of the typed literals, for example 3_ui8 or 2.5_f32
+_int_suffix = re.compile(r'(.+)_u?i\d+')
+_float_suffix = re.compile(r'(.+)_f\d+')
+
+
 class Literal(Value):
     """A literal value."""
 
@@ -62,14 +64,14 @@ class Literal(Value):
             value = 'math.inf'
         elif value == '-Inf':
             value = '-math.inf'
-        else:
+        elif '_' in value:
             # the following regular expressions are not exact
             # but should be enough for this context
-            value = re.sub(r'(.+)_u?i\d+', r'\1', value)
-            value = re.sub(r'(.+)_f\d+', r'\1', value)
+            value = _int_suffix.sub(r'\1', value)
+            value = _float_suffix.sub(r'\1', value)
         self.value = value
 
-    def flatten(self, suffix: str, literals: List[Tuple[str, str]]):
+    def flatten(self, suffix: str, literals: List[Tuple[str, str]], min_size: int = 0):
         """Flatten the value."""
         literals.append((suffix, self.value))
 
@@ -81,10 +83,34 @@ class ListLiterals(Value):
         """Initialize the values."""
         self.values = values
 
-    def flatten(self, suffix: str, literals: List[Tuple[str, str]]):
+    def flatten(self, suffix: str, literals: List[Tuple[str, str]], min_size: int = 0):
         """Flatten the values."""
-        for i, value in enumerate(self.values):
-            value.flatten('%s[%d]' % (suffix, i), literals)
+        if min_size and self.get_size() >= min_size:
+            literals.append((suffix, self.to_python()))
+        else:
+            for i, value in enumerate(self.values):
+                value.flatten('%s[%d]' % (suffix, i), literals, min_size)
+
+    def get_size(self) -> int:
+        """Return the number of scalars of a homogeneous array, else 0."""
+        first = self.values[0]
+        if isinstance(first, Literal):
+            return len(self.values) if all(isinstance(_, Literal) for _ in self.values) else 0
+        if not isinstance(first, ListLiterals):
+            return 0
+        size = first.get_size()
+        for value in self.values[1:]:
+            if not isinstance(value, ListLiterals) or value.get_size() != size:
+                return 0
+        return size * len(self.values)
+
+    def to_python(self) -> str:
+        """Return the Python syntax of a homogeneous array, as nested tuples."""
+        items = [
+            _.value if isinstance(_, Literal) else _.to_python()  # type: ignore
+            for _ in self.values
+        ]
+        return '(%s,)' % items[0] if len(items) == 1 else '(%s)' % ', '.join(items)
 
 
 class StructFields(Value):
@@ -94,46 +120,218 @@ class StructFields(Value):
         """Initialize the fields."""
         self.fields = {name: value for name, value in fields}
 
-    def flatten(self, suffix: str, literals: List[Tuple[str, str]]):
+    def flatten(self, suffix: str, literals: List[Tuple[str, str]], min_size: int = 0):
         """Flatten the fields."""
         for name, value in self.fields.items():
             name = name + '_' if iskeyword(name) else name
-            value.flatten('%s.%s' % (suffix, name), literals)
-
-
-LBRACE, RBRACE, LPAR, RPAR, COLON, COMMA = map(Suppress, '{}():,')
-ident = Word(alphas + '_', alphanums + '_').set_name('name')
-literal = Regex(r'[^ \t\(\)\{\},:]+').set_parse_action(lambda t: Literal(t[0]))
-value_defn = Forward()
-field_defn = (ident('name') + COLON + value_defn('value')).set_parse_action(
-    lambda t: (t['name'], t['value'])
-)
-struct_defn = (LBRACE + DelimitedList(field_defn, ',')('fields') + RBRACE).set_parse_action(
-    lambda t: StructFields(t['fields'])
-)
-array_defn = (LPAR + DelimitedList(value_defn, ',')('values') + RPAR).set_parse_action(
-    lambda t: ListLiterals(t['values'])
-)
-value_defn << (struct_defn | array_defn | literal)
-
-
-def flatten(literal: Union[list, dict, str]):
-    """Flatten the literal."""
-
-    def parse(literal: Union[list, dict, str]) -> Value:
-        """Parse the literal."""
-        if isinstance(literal, list):
-            return ListLiterals([parse(_) for _ in literal])
-        elif isinstance(literal, dict):
-            return StructFields([(name, parse(value)) for name, value in literal.items()])
+            value.flatten('%s.%s' % (suffix, name), literals, min_size)
+
+
+@lru_cache(maxsize=None)
+def _grammar() -> dict:
+    """
+    Build the pyparsing grammar for the values.
+
+    The grammar is built on demand, when the hand-written parser fails:
+    pyparsing is expensive to import and to initialize.
+    """
+    from pyparsing import (
+        DelimitedList,
+        Forward,
+        Regex,
+        Suppress,
+        Word,
+        alphanums,
+        alphas,
+    )
+
+    LBRACE, RBRACE, LPAR, RPAR, COLON, COMMA = map(Suppress, '{}():,')  # noqa: N806
+    ident = Word(alphas + '_', alphanums + '_').set_name('name')
+    literal = Regex(r'[^ \t\(\)\{\},:]+').set_parse_action(lambda t: Literal(t[0]))
+    value_defn = Forward()
+    field_defn = (ident('name') + COLON + value_defn('value')).set_parse_action(
+        lambda t: (t['name'], t['value'])
+    )
+    struct_defn = (LBRACE + DelimitedList(field_defn, ',')('fields') + RBRACE).set_parse_action(
+        lambda t: StructFields(t['fields'])
+    )
+    array_defn = (LPAR + DelimitedList(value_defn, ',')('values') + RPAR).set_parse_action(
+        lambda t: ListLiterals(t['values'])
+    )
+    value_defn << (struct_defn | array_defn | literal)
+    return {
+        'ident': ident,
+        'literal': literal,
+        'value_defn': value_defn,
+        'field_defn': field_defn,
+        'struct_defn': struct_defn,
+        'array_defn': array_defn,
+    }
+
+
+def __getattr__(name: str):
+    """Return the elements of the grammar, built on demand."""
+    if name in {'ident', 'literal', 'value_defn', 'field_defn', 'struct_defn', 'array_defn'}:
+        return _grammar()[name]
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+# tokens for the hand-written parser, consistent with the above grammar
+_blanks = re.compile(r'[ \t\r\n]*')
+_ident = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_literal = re.compile(r'[^ \t\(\)\{\},:]+')
+
+
+class ValueParser:
+    """
+    Recursive descent parser for the values.
+
+    This parser is equivalent to the pyparsing grammar ``value_defn`` but much
+    faster. It raises ``ValueError`` for any syntax it does not recognize.
+    """
+
+    def __init__(self, text: str):
+        """Initialize the parser."""
+        self.text = text
+        self.pos = 0
+
+    def parse(self) -> Value:
+        """Parse the text, which must contain a single value."""
+        value = self.parse_value()
+        self.skip()
+        if self.pos != len(self.text):
+            raise ValueError('unexpected text at position %d' % self.pos)
+        return value
+
+    def skip(self):
+        """Skip the blank characters."""
+        self.pos = _blanks.match(self.text, self.pos).end()  # type: ignore
+
+    def peek(self) -> str:
+        """Return the next character after the blanks."""
+        self.skip()
+        return self.text[self.pos : self.pos + 1]
+
+    def expect(self, char: str):
+        """Consume a given character."""
+        if self.peek() != char:
+            raise ValueError('%s expected at position %d' % (char, self.pos))
+        self.pos += 1
+
+    def match(self, regex: re.Pattern) -> str:
+        """Consume a token."""
+        self.skip()
+        match_ = regex.match(self.text, self.pos)
+        if not match_:
+            raise ValueError('unexpected text at position %d' % self.pos)
+        self.pos = match_.end()
+        return match_.group()
+
+    def parse_value(self) -> Value:
+        """Parse a structure, an array or a literal."""
+        char = self.peek()
+        if char == '{':
+            self.pos += 1
+            fields = [self.parse_field()]
+            while self.peek() == ',':
+                self.pos += 1
+                fields.append(self.parse_field())
+            self.expect('}')
+            return StructFields(fields)
+        elif char == '(':
+            self.pos += 1
+            values = [self.parse_value()]
+            while self.peek() == ',':
+                self.pos += 1
+                values.append(self.parse_value())
+            self.expect(')')
+            return ListLiterals(values)
         else:
-            # assert isinstance(literal, str)
-            result = value_defn.parse_string(literal)[0]
-            assert isinstance(result, Value)  # nosec B101  # addresses linter
-            return result
+            return Literal(self.match(_literal))
+
+    def parse_field(self) -> Tuple[str, Value]:
+        """Parse a field of a structure."""
+        name = self.match(_ident)
+        self.expect(':')
+        return name, self.parse_value()
+
+
+def parse_value(text: str) -> Value:
+    """Parse a value, using pyparsing only when the hand-written parser fails."""
+    try:
+        return ValueParser(text).parse()
+    except ValueError:
+        result = _grammar()['value_defn'].parse_string(text)[0]
+        assert isinstance(result, Value)  # nosec B101  # addresses linter
+        return result
+
+
+# maximum number of distinct values kept in the cache of flatten
+FLATTEN_CACHE_SIZE = 4096
+
 
+def _hashable(literal: Union[list, dict, str]) -> Union[tuple, str]:
+    """Return a hashable form of a literal, to use as a cache key."""
+    if isinstance(literal, list):
+        return ('list', tuple(_hashable(_) for _ in literal))
+    elif isinstance(literal, dict):
+        return ('dict', tuple((name, _hashable(value)) for name, value in literal.items()))
+    else:
+        return literal
+
+
+def _parse(key: Union[tuple, str]) -> Value:
+    """Parse the hashable form of a literal."""
+    if isinstance(key, tuple):
+        kind, items = key
+        if kind == 'list':
+            return ListLiterals([_parse(_) for _ in items])
+        else:
+            return StructFields([(name, _parse(value)) for name, value in items])
+    else:
+        # assert isinstance(key, str)
+        return parse_value(key)
+
+
+def _flatten(key: Union[tuple, str], min_size: int = 0) -> Tuple[Tuple[str, str], ...]:
+    """Flatten the hashable form of a literal."""
     literals = []
-    tree = parse(literal)
-    tree.flatten('', literals)
+    tree = _parse(key)
+    tree.flatten('', literals, min_size)
+    return tuple(literals)
+
+
+_cached_flatten = lru_cache(maxsize=FLATTEN_CACHE_SIZE)(_flatten)
+
+
+def flatten(literal: Union[list, dict, str], min_size: int = 0) -> List[Tuple[str, str]]:
+    """
+    Flatten the literal.
+
+    The arrays of at least ``min_size`` scalars, possibly nested, are kept
+    as tuples, for example ``('.a', '(1, 2, 3)')``.
+
+    The results are cached: the values of large scenarios are often the same.
+    """
+    return list(_cached_flatten(_hashable(literal), min_size))
+
+
+def flatten_cache_info():
+    """Return the statistics of the cache of ``flatten``: hits, misses, maxsize and currsize."""
+    return _cached_flatten.cache_info()
+
+
+def flatten_cache_clear():
+    """Clear the cache of ``flatten`` and its statistics."""
+    _cached_flatten.cache_clear()
+
+
+def set_flatten_cache_size(size: Optional[int]):
+    """
+    Set the maximum size of the cache of ``flatten``.
+
+    The cache is cleared. ``0`` disables the cache and ``None`` makes it unbounded.
+    """
+    global _cached_flatten
 
-    return literals
+    _cached_flatten = lru_cache(maxsize=size)(_flatten)
@@ -0,0 +1,132 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Unit tests for actions.py."""
+
+import pytest
+
+from ansys.scade.pyhg.actions import (
+    CheckAction,
+    CommentAction,
+    CycleAction,
+    SetAction,
+    UncheckAction,
+    create_pipeline,
+)
+
+
+def run_pipeline(actions: list, optimize: bool = True) -> list:
+    """Return the actions leaving a pipeline."""
+    result = []
+    pipeline = create_pipeline(result.append, optimize)
+    for action in actions:
+        pipeline.push(action)
+    pipeline.flush()
+    return result
+
+
+@pytest.mark.parametrize(
+    'actions, expected',
+    [
+        # consecutive cycles
+        (
+            [CycleAction(1), CycleAction(2), CommentAction('# c'), CycleAction(1)],
+            [CycleAction(3), CommentAction('# c'), CycleAction(1)],
+        ),
+        # redundant sets
+        (
+            [SetAction('root', 'a', '1'), CycleAction(1), SetAction('root', 'a', '1')],
+            [SetAction('root', 'a', '1'), CycleAction(1)],
+        ),
+        (
+            [SetAction('root', 'a', '1'), SetAction('root', 'a', '2'), SetAction('root', 'a', '1')],
+            [SetAction('root', 'a', '1'), SetAction('root', 'a', '2'), SetAction('root', 'a', '1')],
+        ),
+        (
+            [SetAction('root', 'a', '1'), SetAction('sensors', 'a', '1')],
+            [SetAction('root', 'a', '1'), SetAction('sensors', 'a', '1')],
+        ),
+        # overlapping sets
+        (
+            [
+                SetAction('root', 'a[0]', '1'),
+                SetAction('root', 'a', 'x'),
+                SetAction('root', 'a[0]', '1'),
+            ],
+            [
+                SetAction('root', 'a[0]', '1'),
+                SetAction('root', 'a', 'x'),
+                SetAction('root', 'a[0]', '1'),
+            ],
+        ),
+        (
+            [
+                SetAction('root', 'a', 'x'),
+                SetAction('root', 'a.b', '1'),
+                SetAction('root', 'a', 'x'),
+            ],
+            [
+                SetAction('root', 'a', 'x'),
+                SetAction('root', 'a.b', '1'),
+                SetAction('root', 'a', 'x'),
+            ],
+        ),
+        # duplicate checks
+        (
+            [CheckAction('v', '1', 1, '', ''), CheckAction('v', '1', 1, '', '')],
+            [CheckAction('v', '1', 1, '', '')],
+        ),
+        (
+            [CheckAction('v', '1', 1, '', ''), CheckAction('v', '1', 2, '', '')],
+            [CheckAction('v', '1', 1, '', ''), CheckAction('v', '1', 2, '', '')],
+        ),
+        (
+            [CheckAction('v', '1', 1, '', ''), CycleAction(1), CheckAction('v', '1', 1, '', '')],
+            [CheckAction('v', '1', 1, '', ''), CycleAction(1), CheckAction('v', '1', 1, '', '')],
+        ),
+        (
+            [
+                CheckAction('v', '1', -1, '', ''),
+                UncheckAction('v'),
+                CheckAction('v', '1', -1, '', ''),
+            ],
+            [
+                CheckAction('v', '1', -1, '', ''),
+                UncheckAction('v'),
+                CheckAction('v', '1', -1, '', ''),
+            ],
+        ),
+    ],
+)
+def test_optimize(actions: list, expected: list):
+    assert run_pipeline(actions) == expected
+
+
+def test_no_optimize():
+    actions = [
+        SetAction('root', 'a', '1'),
+        CycleAction(1),
+        SetAction('root', 'a', '1'),
+        CycleAction(1),
+    ]
+    assert run_pipeline(actions, optimize=False) == actions
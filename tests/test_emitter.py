@@ -0,0 +1,109 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Unit tests for emitter.py."""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from ansys.scade.pyhg.emitter import (
+    Emitter,
+    FileEmitter,
+    MemoryEmitter,
+    StreamEmitter,
+    create_emitter,
+)
+
+
+def emit(emitter: Emitter, imports: list[str]):
+    emitter.write_header('# banner\n')
+    emitter.writeln('')
+    emitter.writeln('root.a = 1')
+    for module in imports:
+        emitter.add_import(module)
+
+
+@pytest.mark.parametrize(
+    'imports, expected',
+    [
+        ([], '# banner\n\nroot.a = 1\n'),
+        (['math'], '# banner\n\nimport math\n\nroot.a = 1\n'),
+        (['sys', 'math', 'sys'], '# banner\n\nimport math\nimport sys\n\nroot.a = 1\n'),
+    ],
+)
+def test_memory_emitter(imports: list[str], expected: str):
+    emitter = MemoryEmitter()
+    emit(emitter, imports)
+    assert emitter.close()
+    assert emitter.text == expected
+
+
+@pytest.mark.parametrize('kind', ['file', 'stream'])
+def test_file_emitters(tmp_path: Path, kind: str):
+    path = tmp_path / 'scenario.py'
+    emitter = create_emitter(kind, path)
+    emit(emitter, ['math'])
+    assert emitter.close()
+    text = path.read_text()
+    assert text == '# banner\n\nimport math\n\nroot.a = 1\n'
+    # same content: the file is not modified
+    emitter = create_emitter(kind, path)
+    emit(emitter, ['math'])
+    assert not emitter.close()
+    # new content
+    emitter = create_emitter(kind, path)
+    emit(emitter, [])
+    assert emitter.close()
+    assert path.read_text() == '# banner\n\nroot.a = 1\n'
+
+
+def test_stream_emitter_spool(tmp_path: Path):
+    # small spool size to force the usage of a temporary file
+    path = tmp_path / 'scenario.py'
+    emitter = StreamEmitter(path, max_size=16)
+    lines = ['root.a = %d' % i for i in range(10000)]
+    for line in lines:
+        emitter.writeln(line)
+    assert emitter.close()
+    assert path.read_text() == '\n'.join(lines) + '\n'
+    # the existing file is longer
+    emitter = StreamEmitter(path, max_size=16)
+    emitter.writeln(lines[0])
+    assert emitter.close()
+    assert path.read_text() == lines[0] + '\n'
+
+
+def test_stream_emitter_stream():
+    stream = io.StringIO()
+    emitter = StreamEmitter(stream)
+    emit(emitter, [])
+    assert emitter.close()
+    assert stream.getvalue() == '# banner\n\nroot.a = 1\n'
+
+
+def test_create_emitter_error(tmp_path: Path):
+    with pytest.raises(ValueError):
+        create_emitter('unknown', tmp_path / 'scenario.py')
+    assert isinstance(create_emitter('file', tmp_path / 'scenario.py'), FileEmitter)
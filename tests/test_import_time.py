@@ -0,0 +1,68 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Guards the import time of the modules used by the generated scripts and THG.
+
+The tests import the modules in a subprocess and verify that the expensive
+modules are not imported. The import time itself is not measured: it depends
+on the load of the machine.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+# modules which must be imported on demand only
+EXPENSIVE = {
+    'pyparsing',
+    'importlib.metadata',
+    'concurrent.futures.process',
+    'tempfile',
+    'numpy',
+}
+
+
+def imported_modules(module: str) -> set[str]:
+    """Return the names of the modules loaded by the import of a module."""
+    code = 'import sys, %s; print("\\n".join(sys.modules))' % module
+    status = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    assert status.returncode == 0, status.stderr
+    return set(status.stdout.split())
+
+
+@pytest.mark.parametrize(
+    'module',
+    [
+        # used by each generated script
+        'ansys.scade.pyhg.lib.thgrt',
+        # used by each invocation of THG
+        'ansys.scade.pyhg.pyhg',
+    ],
+)
+def test_import_time(module: str):
+    imported = imported_modules(module)
+    assert module in imported
+    assert not imported & EXPENSIVE
+    assert not {_ for _ in imported if _.split('.')[0] == 'scade'}
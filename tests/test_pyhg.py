@@ -125,6 +125,30 @@ def test_ios(first_p1, io_path: str, kind: str, expected: str):
         assert cls.is_output(io_path)
     if kind == 'S':
         assert cls.is_sensor(io_path)
+    assert cls.ios[io_path].kind == kind
+    assert cls.ios[io_path].root == ('sensors' if kind == 'S' else 'root')
+
+
+def test_resolve_dip(first_p1, capsys):
+    _, _, mf = first_p1
+    cls = pyhg.PyHG()
+    operator = cls.get_operator(mf, 'P::Main/')
+    assert operator
+    cls.init_ios(mf, operator)
+    cls.on_alias(0, 0, 'x', 'P::Main/a1')
+    path, projection, io = cls.resolve_dip('x[1]')
+    assert (path, projection) == ('P::Main/a1', '[1]')
+    assert io and io.kind == 'I'
+    assert cls.resolve_target('x[1]') == ('root', 'a1', '[1]')
+    assert cls.resolve_target('P::s.c[2]') == ('sensors', 's', '.c[2]')
+    # the cache is cleared when the aliases change
+    cls.on_alias(0, 0, 'x', 'P::Main/v')
+    assert cls.resolve_target('x[1]') == ('root', 'v', '[1]')
+    # unknown I/O
+    capsys.readouterr()
+    assert cls.resolve_dip('P::Main/y') == ('P::Main/y', '', None)
+    assert cls.resolve_target('P::Main/y') == ('root', '<P::Main/y>', '')
+    assert 'unknown I/O' in capsys.readouterr().out
 
 
 @pytest.mark.parametrize(
@@ -156,3 +180,35 @@ def test_writeln(text: str, expected: str, capsys):
     cls.writeln(text)
     captured = capsys.readouterr()
     assert captured.out == expected
+
+
+def test_manifest(tmp_path):
+    scenario = tmp_path / 'scenario.sss'
+    scenario.write_text('SSM::cycle\n')
+    target = tmp_path / 'p_r.py'
+    scenarios = [(str(scenario), False)]
+    signature = {'version': '1', 'options': []}
+
+    def is_up_to_date(signature: dict) -> bool:
+        manifest = pyhg.Manifest(tmp_path / 'manifest.json')
+        manifest.load(signature)
+        status = manifest.is_up_to_date(target, scenarios)
+        manifest.save()
+        return status
+
+    # no previous generation
+    assert not is_up_to_date(signature)
+    # the target file does not exist
+    assert not is_up_to_date(signature)
+    target.write_text('')
+    assert is_up_to_date(signature)
+    # modification of the scenario
+    scenario.write_text('SSM::cycle 2\n')
+    assert not is_up_to_date(signature)
+    assert is_up_to_date(signature)
+    # modification of the options
+    assert not is_up_to_date({'version': '1', 'options': ['-module_name x']})
+    # missing scenario
+    scenario.unlink()
+    assert not is_up_to_date(signature)
+    assert not is_up_to_date(signature)
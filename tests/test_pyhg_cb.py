@@ -22,7 +22,9 @@
 
 """Unit tests for pyhg.py."""
 
+import importlib.util
 import io
+import json
 from pathlib import Path
 from typing import Optional
 
@@ -31,6 +33,8 @@ from scade.code.suite.mapping import c
 import scade.model.project.stdproject as std
 import scade.model.testenv as qte
 
+from ansys.scade.pyhg.backends import FunctionsBackend, TableBackend
+import ansys.scade.pyhg.proxy_thg as thg
 import ansys.scade.pyhg.pyhg as pyhg
 from conftest import find_configuration, load_project
 
@@ -50,6 +54,14 @@ def first_p1() -> tuple[std.Project, qte.Procedure, c.MappingFile]:
     return project, procedure, mf
 
 
+@pytest.fixture
+def ssm_parser():
+    """Select the ssm parser, and restore the default one after the test."""
+    thg.select('ssm')
+    yield
+    thg.reset()
+
+
 class TestPyHG(pyhg.PyHG):
     """Redirects the printouts."""
 
@@ -71,6 +83,8 @@ class TestPyHG(pyhg.PyHG):
         self.f.write('\n')
 
     def read(self) -> str:
+        # render the pending actions
+        self.pipeline.flush()
         self.stream.flush()
         text = self.stream.getvalue()
         # reset
@@ -90,6 +104,18 @@ def test_on_cycle(number: str, expected: str):
     assert text == expected
 
 
+def test_on_cycle_optimize():
+    cls = TestPyHG()
+    # the actions are not optimized by default
+    pyhg.on_cycle(cls, 1, 1, '')
+    pyhg.on_cycle(cls, 2, 1, '')
+    assert cls.read() == 'thgrt.cycle(1)\nthgrt.cycle(1)'
+    cls.pipeline = pyhg.create_pipeline(cls.render_action, True)
+    pyhg.on_cycle(cls, 1, 1, '')
+    pyhg.on_cycle(cls, 2, 1, '')
+    assert cls.read() == 'thgrt.cycle(2)'
+
+
 @pytest.mark.parametrize(
     'text, expected',
     [('# hello', '# hello'), ('#', '')],
@@ -115,6 +141,22 @@ def test_on_set(first_p1, name: str, value: str, expected: str):
     assert text == expected
 
 
+@pytest.mark.parametrize(
+    'bulk_size, expected',
+    [
+        (0, 'root.a1[0] = 12\nroot.a1[1] = 46'),
+        (2, "thgrt.set_value(root, 'a1', (12, 46))"),
+        (3, 'root.a1[0] = 12\nroot.a1[1] = 46'),
+    ],
+)
+def test_on_set_bulk(first_p1, bulk_size: int, expected: str):
+    _, _, mf = first_p1
+    cls = TestPyHG(mf, 'P::Main')
+    cls.bulk_size = bulk_size
+    pyhg.on_set(cls, 12, 46, 'P::Main/a1', '(12, 46)')
+    assert cls.read() == expected
+
+
 @pytest.mark.parametrize(
     # options = (name, value, sustain, tol, global_tol)
     'options, expected',
@@ -144,6 +186,16 @@ def test_on_check(first_p1, options: tuple[str, str, str, str, str], expected: s
     assert text == expected
 
 
+def test_on_check_bulk(first_p1):
+    _, _, mf = first_p1
+    cls = TestPyHG(mf, 'P::Main')
+    cls.bulk_size = 2
+    pyhg.on_check(cls, 12, 46, 'P::Main/v', '(12, 46)', '', '0', '', '')
+    assert cls.read() == 'thgrt.check("v", (12, 46))'
+    pyhg.on_uncheck(cls, 13, 46, 'P::Main/v')
+    assert cls.read() == 'thgrt.uncheck("v")'
+
+
 @pytest.mark.parametrize(
     # options = (name, value, sustain, tol, global_tol)
     'name, value, expected',
@@ -201,6 +253,90 @@ def test_on_set_or_check(first_p1, name: str, value: str, expected: str, capsys)
 # def test_on_alias(...):
 
 
+def test_table_backend(first_p1):
+    _, _, mf = first_p1
+    cls = TestPyHG(mf, 'P::Main')
+    cls.backend = TableBackend(cls)
+    pyhg.on_alias(cls, 2, 3, 'v1', 'P::Main/v1')
+    pyhg.on_set_tol(cls, 0, 0, '', '0', '0.1')
+    pyhg.on_comment(cls, 1, 1, '# step 1')
+    pyhg.on_set(cls, 2, 1, 'P::Main/a1', '(1, 2)')
+    pyhg.on_set(cls, 2, 1, 'P::s[0]', '3.5')
+    pyhg.on_check(cls, 3, 1, 'v1', '2.5', 'forever', '', '', '')
+    pyhg.on_check(cls, 4, 1, 'P::Main/v2', 'true', '', '', '', '')
+    pyhg.on_cycle(cls, 5, 1, '')
+    assert cls.read() == (
+        '    # step 1\n'
+        '    \'[[[0, "a1[0]", 1], [0, "a1[1]", 2], [1, "s[0]", 3.5]], '
+        '[["v1", 2.5, -1, 0.1, ""], ["v2", true, 1, 0, ""]], [], 1]\\n\''
+    )
+    pyhg.on_uncheck(cls, 6, 1, 'v1')
+    # a check after an uncheck starts a new row
+    pyhg.on_check(cls, 7, 1, 'v1', '3', '', '', '', '')
+    pyhg.on_cycle(cls, 8, 1, '2')
+    assert cls.read() == (
+        '    \'[[], [], ["v1"], 0]\\n\'\n    \'[[], [["v1", 3, 1, 0.1, ""]], [], 2]\\n\''
+    )
+    # pending actions are written when the table is closed
+    pyhg.on_set(cls, 9, 1, 'P::Main/a', '1')
+    cls.backend.close()
+    assert cls.read() == (
+        '    \'[[[0, "a", 1]], [], [], 0]\\n\'\n'
+        ')\n'
+        '\n'
+        'thgrt.run_steps((root, sensors), steps)\n'
+        'thgrt.close()\n'
+        '# end of file'
+    )
+
+
+def test_table_backend_empty(first_p1):
+    _, _, mf = first_p1
+    cls = TestPyHG(mf, 'P::Main')
+    cls.backend = TableBackend(cls)
+    # the table is a valid argument even without rows
+    cls.backend.close()
+    assert cls.read().startswith("    ''\n)\n")
+
+
+def test_functions_backend(first_p1):
+    _, _, mf = first_p1
+    cls = TestPyHG(mf, 'P::Main')
+    cls.backend = FunctionsBackend(cls, chunk_size=3)
+    pyhg.on_set(cls, 1, 1, 'P::Main/a', '1')
+    pyhg.on_cycle(cls, 2, 1, '')
+    # the function is closed at the end of the step exceeding the chunk size
+    pyhg.on_check(cls, 3, 1, 'P::Main/v', '2', '', '', '', '')
+    pyhg.on_cycle(cls, 4, 1, '')
+    assert cls.read() == (
+        'def _part_1(\n'
+        '    root=root, sensors=sensors, set_value=thgrt.set_value,\n'
+        '    check=thgrt.check, uncheck=thgrt.uncheck, cycle=thgrt.cycle,\n'
+        '):\n'
+        '    root.a = 1\n'
+        '    cycle(1)\n'
+        '    check("v", 2)\n'
+        '    cycle(1)'
+    )
+    # a function containing only comments
+    pyhg.on_comment(cls, 5, 1, '# end')
+    cls.backend.close()
+    assert cls.read() == (
+        'def _part_2(\n'
+        '    root=root, sensors=sensors, set_value=thgrt.set_value,\n'
+        '    check=thgrt.check, uncheck=thgrt.uncheck, cycle=thgrt.cycle,\n'
+        '):\n'
+        '    # end\n'
+        '    pass\n'
+        '\n'
+        '\n'
+        'for _part in (_part_1, _part_2):\n'
+        '    _part()\n'
+        'thgrt.close()\n'
+        '# end of file'
+    )
+
+
 def test_main(first_p1, tmpdir):
     # basic test for PyHG.main: since th ecalls to thg are stubbed,
     # the test only verify the call creates the expected files and returns.
@@ -218,3 +354,161 @@ def test_main(first_p1, tmpdir):
         '-runtime_class my_module.MyRuntime',
     )
     assert expected.exists()
+
+
+def test_main_jobs(first_p1, ssm_parser, tmpdir):
+    # the parallel generation must produce the same files as the serial one
+    project, procedure, _ = first_p1
+    tmpdir = Path(tmpdir)
+    kcg_dir = str(Path(__file__).parent / 'First' / 'Model' / 'KCG')
+    for jobs in ['1', '2']:
+        (tmpdir / jobs).mkdir()
+        pyhg.thg_main(
+            'PYHG2',
+            project,
+            find_configuration(project, 'KCG'),  # unused
+            procedure,
+            kcg_dir,
+            str(tmpdir / jobs),
+            '-module_name first',
+            '-parser ssm',
+            '-jobs %s' % jobs,
+        )
+    for name in ['thg_files.txt', 'p1_nominal.py', 'p1_realspecial.py']:
+        assert (tmpdir / '1' / name).read_text() == (tmpdir / '2' / name).read_text()
+
+
+def test_main_parser_reset(first_p1, tmp_path):
+    project, procedure, _ = first_p1
+    args = [
+        'PYHG2',
+        project,
+        find_configuration(project, 'KCG'),  # unused
+        procedure,
+        str(Path(__file__).parent / 'First' / 'Model' / 'KCG'),
+        str(tmp_path),
+        '-module_name first',
+    ]
+    try:
+        pyhg.thg_main(*args, '-parser ssm')
+        assert thg.selected() == 'ssm'
+        nominal = (tmp_path / 'p1_nominal.py').read_text()
+        # the second generation uses the default parser: no scenario is parsed
+        pyhg.thg_main(*args)
+        assert thg.selected() == ''
+        assert (tmp_path / 'p1_nominal.py').read_text() != nominal
+    finally:
+        thg.reset()
+
+
+def test_main_incremental(first_p1, ssm_parser, tmpdir, capsys):
+    project, procedure, _ = first_p1
+    args = [
+        'PYHG2',
+        project,
+        find_configuration(project, 'KCG'),  # unused
+        procedure,
+        str(Path(__file__).parent / 'First' / 'Model' / 'KCG'),
+        str(tmpdir),
+        '-module_name first',
+        '-parser ssm',
+        '-incremental',
+    ]
+    pyhg.thg_main(*args)
+    assert (tmpdir / 'thg_manifest.json').exists()
+    capsys.readouterr()
+    # second generation: nothing to do
+    pyhg.thg_main(*args)
+    out = capsys.readouterr().out
+    assert 'p1_nominal.py is up to date' in out
+    assert 'p1_realspecial.py is up to date' in out
+    assert Path(tmpdir, 'thg_files.txt').read_text() == 'p1_nominal.py\np1_realspecial.py\n'
+
+
+def test_main_incremental_signature(first_p1, ssm_parser, tmp_path):
+    project, procedure, _ = first_p1
+    pyhg.thg_main(
+        'PYHG2',
+        project,
+        find_configuration(project, 'KCG'),  # unused
+        procedure,
+        str(Path(__file__).parent / 'First' / 'Model' / 'KCG'),
+        str(tmp_path),
+        '-module_name first',
+        '-parser ssm',
+        '-incremental',
+        '',
+    )
+    # the scripts depend on the operator and on the procedure
+    data = json.loads((tmp_path / 'thg_manifest.json').read_text())
+    assert data['signature']['operator'] == procedure.operator
+    assert data['signature']['procedure'] == procedure.name
+
+
+def test_main_incremental_compile(first_p1, ssm_parser, tmp_path, capsys):
+    project, procedure, _ = first_p1
+    args = [
+        'PYHG2',
+        project,
+        find_configuration(project, 'KCG'),  # unused
+        procedure,
+        str(Path(__file__).parent / 'First' / 'Model' / 'KCG'),
+        str(tmp_path),
+        '-module_name first',
+        '-parser ssm',
+        '-incremental',
+        '-compile',
+    ]
+    pyhg.thg_main(*args)
+    # the records generated for their missing byte code are registered
+    data = json.loads((tmp_path / 'thg_manifest.json').read_text())
+    assert sorted(data['records']) == ['p1_nominal.py', 'p1_realspecial.py']
+    capsys.readouterr()
+    pyhg.thg_main(*args)
+    out = capsys.readouterr().out
+    assert 'p1_nominal.py is up to date' in out
+    assert 'p1_realspecial.py is up to date' in out
+
+
+def test_main_compile(first_p1, ssm_parser, tmp_path):
+    project, procedure, _ = first_p1
+    pyhg.thg_main(
+        'PYHG2',
+        project,
+        find_configuration(project, 'KCG'),  # unused
+        procedure,
+        str(Path(__file__).parent / 'First' / 'Model' / 'KCG'),
+        str(tmp_path),
+        '-module_name first',
+        '-parser ssm',
+        '-compile',
+    )
+    files = (tmp_path / 'thg_files.txt').read_text().split()
+    for name in ['p1_nominal.py', 'p1_realspecial.py']:
+        cfile = Path(importlib.util.cache_from_source(str(tmp_path / name)))
+        assert cfile.relative_to(tmp_path).as_posix() in files
+        # flags of the header: checked hash-based byte code
+        assert cfile.read_bytes()[4:8] == b'\x03\x00\x00\x00'
+
+
+def test_parse_scenario_shared(first_p1, ssm_parser, tmp_path, monkeypatch):
+    _, _, mf = first_p1
+    cls = TestPyHG(mf, 'P::Main')
+    preamble = tmp_path / 'Preamble.sss'
+    preamble.write_text(
+        'SSM::alias v1 P::Main/v1\nSSM::set_tolerance real=0.1\nSSM::check v1 0.9\nSSM::cycle\n'
+    )
+    cls.shared_scenarios = {str(preamble)}
+    opened = []
+    open_ = pyhg.thg.open
+    monkeypatch.setattr(pyhg.thg, 'open', lambda *args: opened.append(args[0]) or open_(*args))
+    cls.parse_scenario(str(preamble), False)
+    expected = cls.read()
+    assert expected == 'thgrt.check("v1", 0.9, tolerance=0.1)\nthgrt.cycle(1)'
+    # new record: the replay restores the aliases and tolerances
+    cls.aliases = {}
+    cls.tolerances = {}
+    cls.parse_scenario(str(preamble), False)
+    assert cls.read() == expected
+    assert cls.aliases == {'v1': 'P::Main/v1'}
+    assert opened == [str(preamble)]
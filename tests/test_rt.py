@@ -22,11 +22,14 @@
 
 """Unit tests for thgrt.py."""
 
+import ctypes
 import math
+import queue
 
 import pytest
 
-from ansys.scade.pyhg.lib.thgrt import Thgrt
+from ansys.scade.pyhg.lib import thgrt
+from ansys.scade.pyhg.lib.thgrt import ChangeDrivenThgrt, DeferredThgrt, Thgrt, parse_path
 
 
 class Root:
@@ -43,10 +46,8 @@ class Root:
         self.o += 1
 
 
-class TestThgrt(Thgrt):
-    """Cache the failures."""
-
-    __test__ = False
+class FailureCache:
+    """Cache the failures of a runtime, to combine with the runtime class."""
 
     def __init__(self, *args):
         super().__init__(*args)
@@ -56,6 +57,18 @@ class TestThgrt(Thgrt):
         self.failures.append(args)
 
 
+class TestThgrt(FailureCache, Thgrt):
+    __test__ = False
+
+
+class TestDeferredThgrt(FailureCache, DeferredThgrt):
+    __test__ = False
+
+
+class TestChangeDrivenThgrt(FailureCache, ChangeDrivenThgrt):
+    __test__ = False
+
+
 def test_rt_no_check():
     rt = TestThgrt(Root(), 'Root', 'Procedure')
     # nothing to test
@@ -104,6 +117,52 @@ def test_rt_infinite_sustain():
     rt.close()
 
 
+def test_rt_sustain_register_again():
+    rt = TestThgrt(Root(), 'Root', 'Procedure')
+    rt.check('o', 0, sustain=3)
+    rt.cycle(1)
+    # replaces the previous check, which expiry no longer applies
+    rt.check('o', 0, sustain=4)
+    rt.cycle(2)
+    assert 'o' in rt.checks
+    rt.cycle(2)
+    assert 'o' not in rt.checks
+    assert [_[0] for _ in rt.failures] == [1, 2, 3, 4, 5]
+    # removed and registered again
+    rt.check('o', 0, sustain=1)
+    rt.uncheck('o')
+    rt.check('o', 0, sustain=2)
+    rt.cycle(1)
+    assert 'o' in rt.checks
+    rt.cycle(1)
+    assert not rt.checks
+    assert not rt.expiries
+
+
+def test_rt_one_shot():
+    root = Root()
+    root.v = 0
+    rt = TestThgrt(root, 'Root', 'Procedure')
+    rt.check('v', 0, sustain=-1)
+    rt.check('o', 1)
+    rt.cycle(1)
+    # the one-shot is removed, not the other checks
+    assert list(rt.checks) == ['v']
+    # a one-shot registered again for several cycles
+    rt.check('o', 0)
+    rt.check('o', 2, sustain=2)
+    # a check registered again as a one-shot, and a one-shot removed
+    rt.check('v', 0)
+    rt.check('w', 0)
+    rt.uncheck('w')
+    rt.cycle(1)
+    assert list(rt.checks) == ['o']
+    rt.cycle(1)
+    assert not rt.checks
+    assert not rt.one_shots
+    assert [_[0] for _ in rt.failures] == [3]
+
+
 @pytest.mark.parametrize(
     'check, tolerance, expected',
     [
@@ -177,3 +236,485 @@ def test_rt_special_real(init: float, check: float, expected: bool):
     rt.check('o', check, tolerance=0.001)
     rt.cycle(1)
     assert not rt.failures if expected else rt.failures
+
+
+@pytest.mark.parametrize(
+    'path, expected',
+    [
+        ('o', ((False, 'o'),)),
+        ('s[0]', ((False, 's'), (True, 0))),
+        ('v[1].x[12]', ((False, 'v'), (True, 1), (False, 'x'), (True, 12))),
+    ],
+)
+def test_parse_path(path: str, expected: tuple):
+    assert parse_path(path) == expected
+
+
+@pytest.mark.parametrize('path', ['', '1', 'a[x]', 'a..b', 'a[1'])
+def test_parse_path_error(path: str):
+    with pytest.raises(ValueError):
+        parse_path(path)
+
+
+class Point:
+    def __init__(self):
+        self.x = 0
+        self.y = [0, 0]
+
+
+@pytest.mark.parametrize(
+    'path, expected',
+    [
+        ('o', 3.0),
+        ('p[1].x', 4),
+        ('p[0].y[1]', 5),
+        ('q.p.y', [6, 7]),
+        # not a Python expression
+        ('q.lambda[1]', 9),
+        # not a path
+        ('o-1', 8),
+    ],
+)
+def test_get_accessor(path: str, expected):
+    root = Root(3.0)
+    root.p = [Point(), Point()]
+    root.p[1].x = 4
+    root.p[0].y[1] = 5
+    root.q = Root()
+    root.q.p = Point()
+    root.q.p.y = [6, 7]
+    setattr(root.q, 'lambda', [0, 9])
+    setattr(root, 'o-1', 8)
+    assert thgrt.get_accessor(path)(root) == expected
+
+
+def test_check_path():
+    root = Root()
+    root.p = [Point(), Point()]
+    rt = TestThgrt(root, 'Root', 'Procedure')
+    rt.check('p[1].y[0]', 0, sustain=-1)
+    rt.cycle(1)
+    assert not rt.failures
+    root.p[1].y[0] = 2
+    rt.cycle(1)
+    assert rt.failures == [(2, 'p[1].y[0]', 2, 0)]
+
+
+def test_evaluator():
+    root = Root()
+    root.v = [1.0, 2.0]
+    rt = TestThgrt(root, 'Root', 'Procedure')
+    rt.check('o', 2.0, sustain=-1)
+    rt.check('v', (1.0, 3.0), sustain=-1)
+    rt.check('lambda', 0, sustain=3)
+    setattr(root, 'lambda', 0)
+    # the first cycle is interpreted
+    rt.cycle(1)
+    assert rt.evaluator is None
+    rt.cycle(1)
+    assert rt.evaluator is not None
+    # same failures, in the same order
+    assert rt.failures == [
+        (1, 'o', 1.0, 2.0),
+        (1, 'v[1]', 2.0, 3.0),
+        (2, 'v[1]', 2.0, 3.0),
+    ]
+    rt.failures = []
+    # the expiry of a check changes the set of checks
+    rt.cycle(1)
+    assert rt.evaluator is None
+    assert list(rt.checks) == ['o', 'v']
+    # a new expectation changes the arguments of the evaluator
+    rt.cycle(1)
+    rt.failures = []
+    rt.check('o', 5.0, sustain=-1)
+    assert rt.evaluator is None
+    rt.cycle(2)
+    assert rt.evaluator is not None
+    assert [_[1:] for _ in rt.failures if _[1] == 'o'] == [('o', 6.0, 5.0)]
+    rt.uncheck('v')
+    assert rt.evaluator is None
+
+
+def test_evaluator_disabled():
+    rt = TestThgrt(Root(), 'Root', 'Procedure')
+    rt.evaluator_threshold = None
+    rt.check('o', 1.0, sustain=-1)
+    rt.cycle(3)
+    assert rt.evaluator is None
+    assert [_[0] for _ in rt.failures] == [2, 3]
+
+
+def test_set_value():
+    root = Root()
+    root.p = [Point(), Point()]
+    rt = TestThgrt(root, 'Root', 'Procedure')
+    rt.set_value(root, 'o', 3.0)
+    rt.set_value(root, 'p[1].x', 4)
+    rt.set_value(root, 'p[0].y[1]', 5)
+    assert root.o == 3.0
+    assert root.p[1].x == 4
+    assert root.p[0].y == [0, 5]
+
+
+def test_set_value_bulk():
+    root = Root()
+    root.p = [Point(), Point()]
+    root.m = (ctypes.c_int * 2 * 2)()
+    rt = TestThgrt(root, 'Root', 'Procedure')
+    rt.set_value(root, 'p[0].y', (1, 2))
+    rt.set_value(root, 'p[1]', {'x': 3, 'y': (4, 5)})
+    # matrix of a ctypes wrapper, assigned in place
+    m = root.m
+    rt.set_value(root, 'm', ((6, 7), (8, 9)))
+    assert root.p[0].y == [1, 2]
+    assert root.p[1].x == 3
+    assert root.p[1].y == [4, 5]
+    assert root.m is m
+    assert [list(_) for _ in root.m] == [[6, 7], [8, 9]]
+
+
+@pytest.mark.parametrize(
+    'expected, tolerance',
+    [
+        (True, 0),
+        (False, 0.1),
+        (3, 0),
+        (3, 1),
+        (2.5, 0),
+        (2.5, 0.1),
+        (2.5, -0.1),
+        (math.inf, 0.1),
+        (-math.inf, -0.1),
+        (math.nan, 0),
+    ],
+)
+def test_get_comparator(expected, tolerance: float):
+    # the specialized comparators have the same semantics as compare
+    comparator = thgrt.get_comparator(expected, tolerance)
+    values = [True, False, 0, 1, 2, 3, 4, 2.4, 2.5, 2.6, 2.7, math.inf, -math.inf, math.nan]
+    for value in values:
+        assert comparator(value) == thgrt.compare(value, expected, tolerance), value
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_check_array(monkeypatch, use_numpy: bool):
+    if not use_numpy:
+        monkeypatch.setattr(thgrt, 'get_numpy', lambda: None)
+    root = Root()
+    root.v = [1.0, 2.0, math.nan, 4.0]
+    root.m = [[1, 2], [3, 4]]
+    rt = TestThgrt(root, 'Root', 'Procedure')
+    rt.check('v', (1.0, 2.5, math.nan, 4.05), tolerance=0.1)
+    rt.check('m', ((1, 2), (3, 5)))
+    rt.cycle(1)
+    # only the failing elements are reported
+    assert rt.failures == [(1, 'v[1]', 2.0, 2.5), (1, 'm[1][1]', 4, 5)]
+    rt.failures = []
+    # relative tolerance
+    rt.check('v', (1.05, 2.1, math.nan, math.inf), tolerance=-0.1)
+    rt.cycle(1)
+    assert rt.failures == [(2, 'v[3]', 4.0, math.inf)]
+    rt.failures = []
+    # different shapes
+    rt.check('v', (1.0, 2.0))
+    rt.cycle(1)
+    assert rt.failures == [(3, 'v', root.v, (1.0, 2.0))]
+
+
+def test_run_steps():
+    root = Root()
+    rt = TestThgrt(root, 'Root', 'Procedure')
+    steps = (
+        (((0, 'o', 1.0),), (('o', 2.0, -1, 0, ''),), (), 1),
+        ((), (), (), 2),
+        ((), (), ('o',), 0),
+        ((), (('o', 5.0, 1, 0, ''),), (), 1),
+    )
+    rt.run_steps((root,), steps)
+    # 2.0, then 3.0 and 4.0 fail, then 5.0
+    assert [_[0] for _ in rt.failures] == [2, 3]
+    assert rt.step == 5
+
+
+def test_load_steps():
+    root = Root()
+    rt = TestThgrt(root, 'Root', 'Procedure')
+    steps = rt.load_steps(
+        '[[[0, "o", NaN]], [["o", Infinity, 1, 0, ""]], [], 1]\n[[], [], ["o"], 0]\n'
+    )
+    assert steps[1] == [[], [], ['o'], 0]
+    assert math.isnan(steps[0][0][0][2])
+    rt.run_steps((root,), steps)
+    assert [_[0] for _ in rt.failures] == [1]
+    assert rt.load_steps('') == []
+
+
+def run_scenario(rt: Thgrt):
+    """Run a scenario exercising the registration of the checks."""
+    root = rt.root
+    root.b = True
+    root.v = [1.0, 2.0]
+    rt.check('o', 1.0, sustain=3)
+    rt.check('b', True, sustain=-1)
+    rt.check('v', (1.0, 3.0))
+    rt.cycle(1)
+    # registered again: keeps its position, the previous sustain no longer applies
+    rt.check('o', 5.0, sustain=2, tolerance=0.5)
+    rt.check('i', 0, sustain=-1)
+    root.i = 0
+    rt.cycle(2)
+    root.b = False
+    root.i = 3
+    rt.check('o', 5.0, sustain=-1, tolerance=-0.2)
+    rt.cycle(2)
+    # removed and registered again: moves after the other checks
+    rt.uncheck('b')
+    rt.check('b', True, sustain=2)
+    rt.check('n', math.nan, sustain=-1)
+    root.n = math.nan
+    rt.cycle(1)
+    root.n = 1.0
+    rt.cycle(3)
+    rt.uncheck('o')
+    rt.cycle(1)
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_deferred(monkeypatch, use_numpy: bool):
+    if not use_numpy:
+        monkeypatch.setattr(thgrt, 'get_numpy', lambda: None)
+    expected = TestThgrt(Root(), 'Root', 'Procedure')
+    run_scenario(expected)
+    expected.close()
+    rt = TestDeferredThgrt(Root(), 'Root', 'Procedure')
+    # small trace and batches
+    rt.capacity = 2
+    rt.batch_size = 3
+    rt.__init__(rt.root, 'Root', 'Procedure')
+    run_scenario(rt)
+    # the failures are reported by close
+    assert not rt.failures
+    rt.close()
+    assert expected.failures
+    assert rt.failures == expected.failures
+    # same types
+    assert [type(_[2]) for _ in rt.failures] == [type(_[2]) for _ in expected.failures]
+    assert not rt.test_result
+
+
+def test_deferred_log_failure(capsys):
+    rt = DeferredThgrt(Root(), 'Root', 'Procedure')
+    rt.check('o', 0)
+    rt.cycle(1)
+    capsys.readouterr()
+    rt.close()
+    lines = capsys.readouterr().out.split('\n')
+    assert lines[:2] == ['test failed at step 1: o=1.0 (expected 0)', 'Test result: failed']
+
+
+@pytest.mark.parametrize('tolerance', [0, 0.1, -0.1, 1.5])
+def test_isclose(tolerance: float):
+    # same semantics as compare
+    np = pytest.importorskip('numpy')
+    values = [0, 1, 2.4, 2.5, 2.6, 1e308, -1e308, math.inf, -math.inf, math.nan]
+    pairs = [(value, expected) for value in values for expected in values]
+    actual = np.array([_[0] for _ in pairs])
+    expected = np.array([_[1] for _ in pairs])
+    passed = thgrt._isclose(np, actual, expected, tolerance)
+    assert list(passed) == [thgrt.compare(*_, tolerance) for _ in pairs]
+
+
+class Constant:
+    """Emulates an operator under test with constant outputs."""
+
+    def __init__(self):
+        self.o = 1.0
+        self.b = True
+
+    def call_cycle(self):
+        pass
+
+
+def test_change_driven(capsys):
+    root = Constant()
+    rt = ChangeDrivenThgrt(root, 'Root', 'Procedure')
+    rt.check('o', 2.0, sustain=-1)
+    rt.check('b', True, sustain=3)
+    rt.cycle(3)
+    # the verdicts are reused until the value changes
+    assert (rt.evaluated, rt.skipped) == (2, 4)
+    root.o = 3.0
+    rt.cycle(1)
+    root.o = 2.0
+    rt.cycle(2)
+    rt.uncheck('o')
+    # the check no longer counts
+    rt.check('o', 2.0)
+    root.o = 1.0
+    rt.cycle(1)
+    # the checks with a finite sustain report all their failures
+    rt.check('b', False, sustain=2)
+    rt.cycle(2)
+    rt.close()
+    lines = capsys.readouterr().out.strip().split('\n')
+    assert lines[4:] == [
+        'test failed at step 1: o=1.0 (expected 2.0)',
+        'test failed at step 4: o=3.0 (expected 2.0)',
+        'check o: passed 2 times, failed 4 times',
+        'test failed at step 7: o=1.0 (expected 2.0)',
+        'test failed at step 8: b=True (expected False)',
+        'test failed at step 9: b=True (expected False)',
+        'Comparisons: 6 evaluated, 6 skipped',
+        'Test result: failed',
+        '========================',
+    ]
+
+
+def test_change_driven_nan():
+    root = Constant()
+    root.o = math.nan
+    rt = TestChangeDrivenThgrt(root, 'Root', 'Procedure')
+    rt.check('o', math.nan, sustain=2)
+    rt.cycle(2)
+    rt.check('o', 0.0, sustain=2)
+    rt.cycle(2)
+    # the NaN values are not equal but the verdicts are reused
+    assert (rt.evaluated, rt.skipped) == (2, 2)
+    assert rt.failures == [(3, 'o', root.o, 0.0), (4, 'o', root.o, 0.0)]
+
+
+class Batched(Root):
+    """Emulates an operator under test with a batched entry point."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def call_cycles(self, cycles: int):
+        self.batches.append(cycles)
+        self.o += cycles
+
+
+@pytest.mark.parametrize('root', [Root(), Batched()])
+def test_cycle_without_checks(root):
+    rt = TestThgrt(root, 'Root', 'Procedure')
+    rt.cycle(3)
+    assert (root.o, rt.step) == (3, 4)
+    # the check is evaluated once, then the cycles run without checks
+    rt.check('o', 0, sustain=2)
+    rt.cycle(5)
+    assert (root.o, rt.step) == (8, 9)
+    assert [_[0] for _ in rt.failures] == [4, 5]
+    assert not rt.expiries
+    if isinstance(root, Batched):
+        assert root.batches == [3, 3]
+
+
+def test_sink_cap(capsys):
+    rt = Thgrt(Root(), 'Root', 'Procedure')
+    rt.sink = thgrt.FailureSink(cap=2, buffer_size=10)
+    rt.check('o', 3.0, sustain=-1, tolerance=0.5)
+    rt.cycle(5)
+    capsys.readouterr()
+    # the lines are buffered until close
+    rt.uncheck('o')
+    rt.cycle(1)
+    assert capsys.readouterr().out == ''
+    rt.close()
+    lines = capsys.readouterr().out.split('\n')
+    assert lines[:4] == [
+        'test failed at step 1: o=1.0 (expected 3.0)',
+        'test failed at step 2: o=2.0 (expected 3.0)',
+        'test failed at steps 1 to 5: o failed 4 times, 2 not reported, '
+        'worst at step 1: o=1.0 (expected 3.0)',
+        'Test result: failed',
+    ]
+
+
+def test_sink_file(tmp_path):
+    rt = Thgrt(Root(), 'Root', 'Procedure')
+    path = tmp_path / 'failures.txt'
+    rt.sink = thgrt.FileSink(str(path), buffer_size=2)
+    rt.check('o', 0, sustain=3)
+    rt.cycle(3)
+    rt.close()
+    assert path.read_text() == ''.join(
+        'test failed at step %d: o=%.1f (expected 0)\n' % (_, _) for _ in range(1, 4)
+    )
+
+
+def test_sink_queue():
+    rt = ChangeDrivenThgrt(Root(), 'Root', 'Procedure')
+    lines = queue.Queue()
+    rt.sink = thgrt.QueueSink(lines, cap=1)
+    rt.check('o', math.nan, sustain=-1)
+    rt.cycle(2)
+    rt.close()
+    assert list(lines.queue) == [
+        'test failed at step 1: o=1.0 (expected nan)',
+        'check o: passed 0 times, failed 2 times',
+        'Comparisons: 2 evaluated, 0 skipped',
+        'test failed at steps 1 to 2: o failed 2 times, 1 not reported, '
+        'worst at step 1: o=1.0 (expected nan)',
+    ]
+
+
+def test_metrics(capsys):
+    root = Root()
+    root.p = [Point()]
+    rt = thgrt.MetricsThgrt(root, 'Root', 'Procedure')
+    rt.set_value(root, 'p[0].y', (1, 2))
+    rt.check('o', 1.0, sustain=2)
+    rt.check('p[0].x', 0, sustain=-1)
+    rt.cycle(3)
+    rt.uncheck('p[0].x')
+    rt.cycle(2)
+    capsys.readouterr()
+    rt.close()
+    lines = capsys.readouterr().out.split('\n')
+    assert lines[0] == 'Metrics:'
+    assert lines[4] == 'Test result: failed'
+    metrics = rt.metrics.as_dict()
+    assert [metrics[_] for _ in ['steps', 'registered', 'evaluated', 'expired']] == [5, 2, 5, 1]
+    assert metrics['p50'] <= metrics['p90'] <= metrics['p99'] <= metrics['max']
+    assert metrics['set_value'] > 0
+    assert sum(rt.metrics.histogram().values()) == 5
+
+
+def test_metrics_percentiles():
+    metrics = thgrt.Metrics()
+    assert metrics.percentiles([50]) == [0]
+    metrics.latencies.extend(range(100, 0, -1))
+    assert metrics.percentiles([0, 50, 90, 100]) == [1, 50, 90, 100]
+    # 64 to 100
+    assert metrics.histogram()[128] == 37
+
+
+def test_deferred_long_gap():
+    # cycles without checks, beyond twice the capacity of the trace
+    rt = TestDeferredThgrt(Root(), 'Root', 'Procedure')
+    rt.cycle(5 * rt.capacity)
+    rt.check('o', 0.0)
+    rt.cycle(1)
+    rt.close()
+    step = 5 * rt.capacity + 1
+    assert rt.failures == [(step, 'o', float(step), 0.0)]
+
+
+def test_deferred_int_nan():
+    pytest.importorskip('numpy')
+    root = Root()
+    root.i = 1
+    rt = TestDeferredThgrt(root, 'Root', 'Procedure')
+    rt.check('i', 1, sustain=-1)
+    rt.cycle(1)
+    # an integer output which value is not an integer any longer
+    root.i = math.nan
+    rt.cycle(1)
+    root.i = math.inf
+    rt.cycle(1)
+    rt.close()
+    assert [_[:2] for _ in rt.failures] == [(2, 'i'), (3, 'i')]
+    assert math.isnan(rt.failures[0][2])
+    assert rt.failures[1][2] == math.inf
@@ -0,0 +1,96 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Unit tests for run.py."""
+
+import json
+import sys
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from ansys.scade.pyhg.lib import run
+
+SCENARIO = """
+from ansys.scade.pyhg.lib.thgrt import Thgrt
+
+
+class Root:
+    o = 1.0
+
+    def call_cycle(self):
+        pass
+
+
+thgrt = Thgrt(Root(), 'Root', '{procedure}')
+thgrt.check('o', {expected}, sustain=-1)
+thgrt.cycle(4)
+thgrt.close()
+"""
+
+
+@pytest.fixture
+def scenarios(tmp_path, monkeypatch):
+    """Return a directory of scenarios, importable as a package."""
+    directory = tmp_path / 'scenarios_run'
+    directory.mkdir()
+    (directory / 'nominal.py').write_text(SCENARIO.format(procedure='Nominal', expected=1.0))
+    (directory / 'failure.py').write_text(SCENARIO.format(procedure='Failure', expected=2.0))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(run, 'tests', {})
+    monkeypatch.setattr(run, 'tests_result', True)
+    monkeypatch.setattr(run, 'results', {})
+    yield directory
+    for name in ['scenarios_run', 'scenarios_run.nominal', 'scenarios_run.failure']:
+        sys.modules.pop(name, None)
+
+
+def test_run_reports(scenarios, tmp_path):
+    junit = tmp_path / 'results.xml'
+    report = tmp_path / 'results.json'
+    run.main([str(scenarios), '--junit', str(junit), '--json', str(report)])
+    assert not run.tests_result
+
+    data = json.loads(report.read_text())
+    assert not data['passed']
+    results = {_['scenario']: _ for _ in data['scenarios']}
+    assert results['failure.py']['procedure'] == 'Failure'
+    assert [results['failure.py'][_] for _ in ['passed', 'steps', 'checks', 'failures']] == [
+        False,
+        4,
+        4,
+        4,
+    ]
+    assert results['nominal.py']['passed']
+    assert results['nominal.py']['time_per_cycle'] >= 0
+
+    suite = ET.parse(str(junit)).getroot().find('testsuite')
+    assert (suite.get('name'), suite.get('tests'), suite.get('failures')) == (
+        'scenarios_run',
+        '2',
+        '1',
+    )
+    cases = {_.get('name'): _ for _ in suite.findall('testcase')}
+    assert cases['failure.py'].find('failure').get('message') == '4 failures'
+    assert cases['nominal.py'].find('failure') is None
+    properties = {_.get('name'): _.get('value') for _ in cases['nominal.py'].iter('property')}
+    assert properties['steps'] == '4'
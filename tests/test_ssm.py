@@ -0,0 +1,176 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Unit tests for ssm.py."""
+
+from pathlib import Path
+
+import pytest
+
+import ansys.scade.pyhg.proxy_thg as thg
+from ansys.scade.pyhg.ssm import SsmParser, split_words, unquote
+
+
+class Client:
+    """Records the calls to the callbacks."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name: str):
+        if not name.startswith('on_'):
+            raise AttributeError(name)
+
+        def callback(line: int, col: int, *args):
+            self.calls.append((name[3:], line) + args)
+
+        return callback
+
+
+def parse(tmp_path: Path, text: str) -> list:
+    path = tmp_path / 'scenario.sss'
+    path.write_text(text)
+    client = Client()
+    parser = SsmParser()
+    assert parser.open(str(path), False, client)
+    while parser.parse():
+        pass
+    parser.close()
+    return client.calls
+
+
+@pytest.mark.parametrize(
+    'text, expected',
+    [
+        ('SSM::set a 3', ['SSM::set', 'a', '3']),
+        ('SSM::set  s (1.2, 3.4)', ['SSM::set', 's', '(1.2, 3.4)']),
+        ('SSM::set {s[0]} {NaN}', ['SSM::set', '{s[0]}', '{NaN}']),
+        (
+            'SSM::check v {r : (t, f), i : 2} real= 0.1',
+            ['SSM::check', 'v', '{r : (t, f), i : 2}', 'real=', '0.1'],
+        ),
+        ('SSM::set c "a b"', ['SSM::set', 'c', '"a b"']),
+        ('SSM::set c "a (b" 2', ['SSM::set', 'c', '"a (b"', '2']),
+    ],
+)
+def test_split_words(text: str, expected: list[str]):
+    assert split_words(text) == expected
+
+
+@pytest.mark.parametrize(
+    'word, expected',
+    [
+        ('a', 'a'),
+        ('{s[0]}', 's[0]'),
+        ('{NaN}', 'NaN'),
+        ('{P::Main/a}', 'P::Main/a'),
+        ('{r : 1, i : 2}', '{r : 1, i : 2}'),
+        ('"x"', 'x'),
+    ],
+)
+def test_unquote(word: str, expected: str):
+    assert unquote(word) == expected
+
+
+@pytest.mark.parametrize(
+    'text, expected',
+    [
+        ('# step 1', [('comment', 1, '# step 1')]),
+        ('\n\nSSM::cycle', [('cycle', 3, '')]),
+        ('SSM::cycle 9', [('cycle', 1, '9')]),
+        ('SSM::set {s[0]} 2.1', [('set', 1, 's[0]', '2.1')]),
+        ('SSM::set s (1.2,\n 3.4)', [('set', 1, 's', '(1.2, 3.4)')]),
+        ('SSM::set a \\\n 3', [('set', 1, 'a', '3')]),
+        ('SSM::alias a P::Main/a', [('alias', 1, 'a', 'P::Main/a')]),
+        ('SSM::uncheck v', [('uncheck', 1, 'v')]),
+        ('SSM::set_or_check v 3', [('set_or_check', 1, 'v', '3')]),
+        ('SSM::set_tolerance real= 0.00001', [('set_tol', 1, '', '', '0.00001')]),
+        ('SSM::set_tolerance path=v int=1 real=2%', [('set_tol', 1, 'v', '1', '2%')]),
+        ('SSM::check v 3', [('check', 1, 'v', '3', '', '', '', '')]),
+        (
+            'SSM::check v3 4.6 sustain=forever real=1r',
+            [('check', 1, 'v3', '4.6', 'forever', '', '1r', '')],
+        ),
+        ('SSM::check v 3 sustain= 2', [('check', 1, 'v', '3', '2', '', '', '')]),
+        # the delimiters of the comments and of the strings are not counted
+        (
+            '# set the input (see spec\nSSM::cycle',
+            [('comment', 1, '# set the input (see spec'), ('cycle', 2, '')],
+        ),
+        ('SSM::set c "a (b"\nSSM::cycle', [('set', 1, 'c', 'a (b'), ('cycle', 2, '')]),
+    ],
+)
+def test_parse_nominal(tmp_path, text: str, expected: list[tuple]):
+    assert parse(tmp_path, text) == expected
+
+
+@pytest.mark.parametrize(
+    'text',
+    ['SSM::unknown a', 'set a 3', 'SSM::set a', 'SSM::cycle 1 2'],
+)
+def test_parse_error(tmp_path, text: str):
+    calls = parse(tmp_path, text)
+    assert len(calls) == 1
+    assert calls[0][0] == 'error'
+
+
+def test_parse_first():
+    # parse all the scenarios of the First example
+    test_dir = Path(__file__).parent / 'First' / 'Test'
+    client = Client()
+    parser = SsmParser()
+    for name in ['MainInit.sss', 'Preamble.sss', 'MainNominal.sss']:
+        assert parser.open(str(test_dir / name), name == 'MainInit.sss', client)
+        while parser.parse():
+            pass
+        parser.close()
+    kinds = {_[0] for _ in client.calls}
+    assert 'error' not in kinds
+    assert kinds == {'comment', 'alias', 'set_tol', 'set', 'check', 'cycle'}
+    assert ('set', 14, 's[0]', '2.1') in client.calls
+
+
+def test_open_error(tmp_path, capsys):
+    parser = SsmParser()
+    capsys.readouterr()
+    assert not parser.open(str(tmp_path / 'unknown.sss'), False, Client())
+    assert capsys.readouterr().out
+    assert not parser.parse()
+
+
+def test_proxy_select(tmp_path):
+    path = tmp_path / 'scenario.sss'
+    path.write_text('SSM::cycle\n')
+    client = Client()
+    try:
+        thg.select('ssm')
+        assert thg.selected() == 'ssm'
+        assert thg.open(str(path), False, client)
+        while thg.parse():
+            pass
+        thg.close()
+        assert client.calls == [('cycle', 1, '')]
+    finally:
+        thg.select('')
+    with pytest.raises(ValueError):
+        thg.select('unknown')
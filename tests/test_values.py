@@ -22,9 +22,20 @@
 
 """Unit tests for values.py."""
 
+import random
+
 import pytest
 
-from ansys.scade.pyhg.values import flatten
+from ansys.scade.pyhg.values import (
+    FLATTEN_CACHE_SIZE,
+    ValueParser,
+    flatten,
+    flatten_cache_clear,
+    flatten_cache_info,
+    parse_value,
+    set_flatten_cache_size,
+    value_defn,
+)
 
 
 @pytest.mark.parametrize(
@@ -67,3 +78,107 @@ from ansys.scade.pyhg.values import flatten
 def test_flatten_nominal(value: str | list | dict, expected: list[tuple[str, str]]):
     literals = flatten(value)
     assert literals == expected
+
+
+@pytest.mark.parametrize(
+    'value, min_size, expected',
+    [
+        ('(1, 2, 3)', 3, [('', '(1, 2, 3)')]),
+        ('(1, 2, 3)', 4, [('[0]', '1'), ('[1]', '2'), ('[2]', '3')]),
+        ('(t)', 1, [('', '(True,)')]),
+        ('((1, 2), (3, 4))', 4, [('', '((1, 2), (3, 4))')]),
+        # not homogeneous
+        ('((1, 2), 3)', 2, [('[0]', '(1, 2)'), ('[1]', '3')]),
+        ('((1, 2), (3))', 3, [('[0][0]', '1'), ('[0][1]', '2'), ('[1][0]', '3')]),
+        ('{x: (1, 2), y: 3}', 2, [('.x', '(1, 2)'), ('.y', '3')]),
+        ('({x: 1}, {x: 2})', 2, [('[0].x', '1'), ('[1].x', '2')]),
+    ],
+)
+def test_flatten_min_size(value: str, min_size: int, expected: list[tuple[str, str]]):
+    assert flatten(value, min_size) == expected
+
+
+def test_flatten_cache():
+    set_flatten_cache_size(2)
+    try:
+        literals = flatten('(1, 2)')
+        assert flatten_cache_info().misses == 1
+        # the result is a copy
+        literals.clear()
+        assert flatten('(1, 2)') == [('[0]', '1'), ('[1]', '2')]
+        assert flatten_cache_info().hits == 1
+        # hashable forms of lists and dictionaries
+        assert flatten(['1', '2']) == [('[0]', '1'), ('[1]', '2')]
+        assert flatten(['1', '2']) == [('[0]', '1'), ('[1]', '2')]
+        assert flatten({'r': ['1'], 'i': '2'}) == [('.r[0]', '1'), ('.i', '2')]
+        assert flatten({'i': '2', 'r': ['1']}) == [('.i', '2'), ('.r[0]', '1')]
+        info = flatten_cache_info()
+        assert (info.hits, info.misses, info.currsize) == (2, 4, 2)
+        flatten_cache_clear()
+        assert flatten_cache_info().currsize == 0
+    finally:
+        set_flatten_cache_size(FLATTEN_CACHE_SIZE)
+
+
+def random_value(rng: random.Random, depth: int = 0) -> str:
+    """Return the text of a random value, with random blanks."""
+
+    def blank() -> str:
+        return rng.choice(['', '', ' ', '  ', '\t', '\n'])
+
+    kind = rng.choice(['literal', 'literal', 'array', 'struct'] if depth < 3 else ['literal'])
+    if kind == 'array':
+        values = [random_value(rng, depth + 1) for _ in range(rng.randint(1, 4))]
+        return '(' + ','.join(blank() + _ + blank() for _ in values) + ')'
+    elif kind == 'struct':
+        names = ['a', 'x1', '_f', 'class', 'r']
+        fields = [
+            blank() + rng.choice(names) + blank() + ':' + blank() + random_value(rng, depth + 1)
+            for _ in range(rng.randint(1, 3))
+        ]
+        return '{' + ','.join(fields) + blank() + '}'
+    else:
+        literals = ['0', '7_ui8', '-3_i16', '3.14', '+5_f32', '1e-3_f64', 't', 'FALSE']
+        literals += ["'x'", 'NaN', '-Inf', '+Inf', 'a_b', '_i8']
+        return rng.choice(literals)
+
+
+def grammar_flatten(text: str) -> list[tuple[str, str]]:
+    literals = []
+    value_defn.parse_string(text)[0].flatten('', literals)
+    return literals
+
+
+def test_parser_differential():
+    # the hand-written parser and the pyparsing grammar must produce the same trees
+    rng = random.Random(2026)
+    for _ in range(2000):
+        text = random_value(rng)
+        literals = []
+        ValueParser(text).parse().flatten('', literals)
+        assert literals == grammar_flatten(text), text
+
+
+@pytest.mark.parametrize(
+    'text',
+    [
+        # trailing text, ignored by the pyparsing grammar
+        '1 2',
+        '(1, 2) 3',
+    ],
+)
+def test_parser_fallback(text: str):
+    with pytest.raises(ValueError):
+        ValueParser(text).parse()
+    literals = []
+    parse_value(text).flatten('', literals)
+    assert literals == grammar_flatten(text)
+
+
+@pytest.mark.parametrize('text', ['', '()', '(1, )', '{a 1}', '{1: 2}', '(1, 2'])
+def test_parser_error(text: str):
+    with pytest.raises(ValueError):
+        ValueParser(text).parse()
+    # pyparsing's exceptions derive from Exception
+    with pytest.raises(Exception):
+        parse_value(text)